@@ -31,10 +31,25 @@ RESOLUTIONS = {
 
 # Video encoding settings
 VIDEO_CODEC = 'libx264'
-VIDEO_PRESET = 'medium'  # ultrafast, superfast, veryfast, faster, fast, medium, slow, slower, veryslow
-VIDEO_CRF = 23  # Constant Rate Factor (0-51, lower = better quality, 18-28 recommended)
+VIDEO_PRESET = 'veryfast'  # ultrafast, superfast, veryfast, faster, fast, medium, slow, slower, veryslow
+VIDEO_CRF = 24  # Constant Rate Factor (0-51, lower = better quality, 18-28 recommended)
+# veryfast needs ~1 CRF point more than medium for the same file size;
+# go back to 'medium' / 23 if quality matters more than encode time
+# libx264 extras for phone playback: 8-bit 4:2:0, High@4.1 and cheap
+# decoding (no CABAC/deblocking overhead). None leaves a setting out
+VIDEO_TUNE = 'fastdecode'
+VIDEO_PROFILE = 'high'
+VIDEO_LEVEL = '4.1'
 TARGET_FPS = 30
 TARGET_BITRATE = '5M'
+# Software rate control for normalization: 'crf' (constant quality, VIDEO_CRF)
+# or 'vbr' (TARGET_BITRATE average, capped at 1.5x with a 2x buffer).
+# Hardware encoders use their own constant-quality knob (e.g. NVENC -cq)
+RATE_CONTROL = os.getenv('RATE_CONTROL', 'crf').lower()
+
+# Hardware encoding: 'auto' (use first working GPU encoder), 'none' (always CPU),
+# or a specific backend: 'nvenc', 'qsv', 'amf', 'videotoolbox'
+HWACCEL = os.getenv('HWACCEL', 'auto').lower()
 
 # Audio encoding settings
 AUDIO_CODEC = 'aac'
@@ -67,6 +82,9 @@ MAX_CONCURRENT_DOWNLOADS = 3
 # ============================================================================
 # AUDIO ANALYSIS SETTINGS
 # ============================================================================
+# Audio is resampled to this rate (mono) before beat/vocal analysis
+ANALYSIS_SAMPLE_RATE = 22050
+
 # Beat detection
 BEAT_TRACK_UNITS = 'time'  # 'time' or 'frames'
 BEAT_HOP_LENGTH = 512
@@ -146,7 +164,7 @@ TEXT_OVERLAY_MIN_FONT_SIZE = 24        # Minimum font size (pixels)
 TEXT_OVERLAY_MAX_FONT_SIZE = 72        # Maximum font size (pixels)
 
 # Font settings
-TEXT_OVERLAY_FONT_PATH = None          # None = system default font
+TEXT_OVERLAY_FONT_PATH = None          # None = first common system font found (e.g. DejaVu Sans)
 
 # ============================================================================
 # FFMPEG SETTINGS
@@ -154,6 +172,15 @@ TEXT_OVERLAY_FONT_PATH = None          # None = system default font
 FFMPEG_THREADS = os.cpu_count() or 4
 FFMPEG_LOGLEVEL = 'error'  # quiet, panic, fatal, error, warning, info, verbose, debug
 
+# Concurrent conversion/extraction/thumbnail runs through ffmpeg_helper;
+# each gets FFMPEG_THREADS // FFMPEG_MAX_CONCURRENT threads
+FFMPEG_MAX_CONCURRENT = max(1, FFMPEG_THREADS // 2)
+
+# ffprobe results persisted across runs, keyed by path, size and mtime
+# (None = in-memory caching only)
+PROBE_CACHE_PATH = TEMP_DIR / "probe_cache.sqlite"
+PROBE_CACHE_MAX_ENTRIES = 20000
+
 # Normalization filters
 NORMALIZE_FILTERS = {
     'denoise': 'hqdn3d=1.5:1.5:6:6',
@@ -617,6 +617,9 @@ def select_local_videos():
                 # Few videos - show list and ask individually
                 console.print("\n[bold]Select videos to include:[/bold]")
                 
+                # Probe them all up front so the prompts don't wait on ffprobe
+                ffmpeg_helper.probe_files(found_videos)
+                
                 for video in found_videos:
                     # Get video info for display
                     info = ffmpeg_helper.get_video_info(video)
@@ -658,6 +661,7 @@ def select_local_videos():
                         min_duration = 0.0
                     
                     # Filter videos
+                    ffmpeg_helper.probe_files(found_videos)
                     filtered_count = 0
                     for video in found_videos:
                         info = ffmpeg_helper.get_video_info(video)
@@ -928,27 +932,16 @@ def generate_video_phase(video_path, audio_path, cut_config):
         filtered_points = cut_points[::cut_config['interval']]
         console.print(f"[green]✓[/green] Using {len(filtered_points)} points (every {cut_config['interval']}th)")
         
-        # Cut video
-        console.print("\n[cyan]Cutting video segments...[/cyan]")
-        
-        with console.status("[cyan]Creating segments...[/cyan]"):
-            segments = video_cutter.create_segments(
-                video_path=video_path,
-                cut_points=filtered_points,
-                order=cut_config['order'],
-                audio_duration=cut_config['audio_end'] - cut_config['audio_start']
-            )
-        
-        console.print(f"[green]✓[/green] Created {len(segments)} segments")
-        
-        # Merge with audio
+        # Cut video and merge with audio
         console.print("\n[cyan]Generating final video...[/cyan]")
         
         output_path = config.OUTPUTS_DIR / f"final_reel_{Path(video_path).stem}.mp4"
         
-        with console.status("[cyan]Merging segments with audio...[/cyan]"):
-            final_video = video_cutter.merge_with_audio(
-                segments=segments,
+        with console.status("[cyan]Cutting segments and merging with audio...[/cyan]"):
+            final_video = video_cutter.cut_and_merge(
+                video_path=video_path,
+                cut_points=filtered_points,
+                order=cut_config['order'],
                 audio_path=audio_path,
                 audio_start=cut_config['audio_start'],
                 audio_end=cut_config['audio_end'],
@@ -1088,17 +1081,10 @@ def generate(urls, local_videos, local_folder, download_audio, audio_path, cut_m
         
         audio_duration = audio_end if audio_end else ffmpeg_helper.get_audio_duration(audio_path)
         
-        segments = video_cutter.create_segments(
+        final = video_cutter.cut_and_merge(
             video_path=processed,
             cut_points=filtered_points,
             order=order,
-            audio_duration=audio_duration - audio_start
-        )
-        
-        console.print(f"[green]✓[/green] Created {len(segments)} segments")
-        
-        final = video_cutter.merge_with_audio(
-            segments=segments,
             audio_path=audio_path,
             audio_start=audio_start,
             audio_end=audio_duration,
@@ -5,10 +5,11 @@ Handles video normalization, combination, audio analysis, cutting, and image ove
 
 from .normalizer import normalize_video, batch_normalize
 from .combiner import merge_videos, concatenate_segments
-from .audio_analyzer import detect_beats, detect_vocal_changes, analyze_audio
-from .video_cutter import create_segments, merge_with_audio, extract_segment
+from .audio_analyzer import detect_beats, detect_vocal_changes, analyze_audio, analyze_audio_batch
+from .video_cutter import create_segments, merge_with_audio, extract_segment, cut_and_merge
 from .image_overlay import (
     overlay_images_on_video,
+    overlay_images_on_videos,
     preview_image_timing,
     get_images_from_folder,
     validate_overlay_inputs,
@@ -34,14 +35,17 @@ __all__ = [
     'detect_beats',
     'detect_vocal_changes',
     'analyze_audio',
+    'analyze_audio_batch',
     
     # Video Cutter
     'create_segments',
     'merge_with_audio',
     'extract_segment',
+    'cut_and_merge',
     
     # Image Overlay
     'overlay_images_on_video',
+    'overlay_images_on_videos',
     'preview_image_timing',
     'get_images_from_folder',
     'validate_overlay_inputs',
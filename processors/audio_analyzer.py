@@ -4,14 +4,58 @@ Uses librosa for audio analysis
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from pathlib import Path
 from typing import List, Optional, Dict, Tuple
-import librosa
-from scipy.ndimage import gaussian_filter1d
 
 import config
 
+# librosa, scipy, soundfile and numba are imported inside the methods that
+# need them: together they cost seconds of import time (numba warmup) and
+# ~200 MB of RAM, which CLI paths and batch workers that never analyze
+# audio shouldn't pay.
+
+_merge_dedup_jit = None
+
+
+def _merge_dedup(beats: np.ndarray, vocals: np.ndarray, min_gap: float) -> np.ndarray:
+    """Numba-compiled _merge_dedup_py (compiled on first call)"""
+    global _merge_dedup_jit
+    
+    if _merge_dedup_jit is None:
+        from numba import njit
+        _merge_dedup_jit = njit(cache=True)(_merge_dedup_py)
+    
+    return _merge_dedup_jit(beats, vocals, min_gap)
+
+
+def _merge_dedup_py(beats: np.ndarray, vocals: np.ndarray, min_gap: float) -> np.ndarray:
+    """
+    Merge two sorted timestamp arrays, dropping points closer than
+    min_gap to the previously kept one (beats win ties)
+    """
+    out = np.empty(len(beats) + len(vocals))
+    i = 0
+    j = 0
+    k = 0
+    last = -1.0
+    
+    while i < len(beats) or j < len(vocals):
+        if j >= len(vocals) or (i < len(beats) and beats[i] <= vocals[j]):
+            t = beats[i]
+            i += 1
+        else:
+            t = vocals[j]
+            j += 1
+        
+        if t - last > min_gap:
+            out[k] = t
+            k += 1
+            last = t
+    
+    return out[:k]
+
 
 class AudioAnalyzer:
     """Handler for audio analysis using librosa"""
@@ -20,6 +64,112 @@ class AudioAnalyzer:
         """Initialize audio analyzer"""
         self.cache_dir = config.TEMP_DIR / "audio_cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Decoded audio and onset envelopes for the most recently analyzed file
+        self._audio_cache: Dict[Tuple, Tuple[np.ndarray, int]] = {}
+        self._onset_cache: Dict[Tuple, np.ndarray] = {}
+    
+    def _load(self, audio_path: str) -> Tuple[Tuple, np.ndarray, int]:
+        """
+        Decode audio for analysis, reusing the last decoded file
+        
+        Args:
+            audio_path: Path to audio file
+            
+        Returns:
+            Tuple of (cache key, samples, sample rate)
+        """
+        import librosa
+        
+        key = (os.path.abspath(audio_path), os.stat(audio_path).st_mtime_ns)
+        
+        if key not in self._audio_cache:
+            # Load audio (downsampled mono - analysis gains nothing from 44.1/48 kHz)
+            y, sr = librosa.load(
+                audio_path,
+                sr=config.ANALYSIS_SAMPLE_RATE,
+                mono=True,
+                res_type='soxr_hq',
+                dtype=np.float32
+            )
+            
+            # Decoded audio is large - only keep one file around
+            self._audio_cache.clear()
+            self._onset_cache.clear()
+            self._audio_cache[key] = (y, sr)
+        
+        y, sr = self._audio_cache[key]
+        return key, y, sr
+    
+    def _onset_strength(
+        self,
+        key: Tuple,
+        y: np.ndarray,
+        sr: int,
+        hop_length: int = 512,
+        aggregate=np.mean
+    ) -> np.ndarray:
+        """
+        Onset strength envelope, cached per (file, sr, hop_length, aggregate)
+        
+        Args:
+            key: Cache key returned by _load
+            y: Audio samples
+            sr: Sample rate
+            hop_length: Number of samples between frames
+            aggregate: Function used to combine onsets across frequency bins
+            
+        Returns:
+            Onset strength envelope
+        """
+        import librosa
+        
+        cache_key = (key, sr, hop_length, aggregate.__name__)
+        onset_env = self._onset_cache.get(cache_key)
+        
+        if onset_env is None:
+            onset_env = librosa.onset.onset_strength(
+                y=y,
+                sr=sr,
+                hop_length=hop_length,
+                aggregate=aggregate
+            )
+            self._onset_cache[cache_key] = onset_env
+        
+        return onset_env
+    
+    def _beat_track_fast(
+        self,
+        key: Tuple,
+        y: np.ndarray,
+        sr: int,
+        hop_length: int,
+        start_bpm: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Beat tracking on a cached onset envelope
+        
+        Args:
+            key: Cache key returned by _load
+            y: Audio samples
+            sr: Sample rate
+            hop_length: Number of samples between frames
+            start_bpm: Initial BPM estimate
+            
+        Returns:
+            Tuple of (tempo, beat frames)
+        """
+        import librosa
+        
+        # Same envelope librosa.beat.beat_track builds internally from y
+        onset_env = self._onset_strength(key, y, sr, hop_length, aggregate=np.median)
+        
+        return librosa.beat.beat_track(
+            onset_envelope=onset_env,
+            sr=sr,
+            hop_length=hop_length,
+            start_bpm=start_bpm,
+            units='frames'
+        )
     
     def analyze_beats(
         self,
@@ -38,6 +188,8 @@ class AudioAnalyzer:
         Returns:
             List of beat timestamps in seconds
         """
+        import librosa
+        
         try:
             if not os.path.exists(audio_path):
                 if config.DEBUG:
@@ -45,7 +197,7 @@ class AudioAnalyzer:
                 return []
             
             # Load audio
-            y, sr = librosa.load(audio_path, sr=None)
+            key, y, sr = self._load(audio_path)
             
             # Use config defaults if not provided
             if hop_length is None:
@@ -55,13 +207,7 @@ class AudioAnalyzer:
                 start_bpm = config.BEAT_START_BPM
             
             # Detect beats
-            tempo, beat_frames = librosa.beat.beat_track(
-                y=y,
-                sr=sr,
-                hop_length=hop_length,
-                start_bpm=start_bpm,
-                units='frames'
-            )
+            tempo, beat_frames = self._beat_track_fast(key, y, sr, hop_length, start_bpm)
             
             # Convert frames to time
             beat_times = librosa.frames_to_time(beat_frames, sr=sr, hop_length=hop_length)
@@ -95,6 +241,9 @@ class AudioAnalyzer:
         Returns:
             List of vocal change timestamps in seconds
         """
+        import librosa
+        from scipy.ndimage import gaussian_filter1d
+        
         try:
             if not os.path.exists(audio_path):
                 if config.DEBUG:
@@ -102,18 +251,22 @@ class AudioAnalyzer:
                 return []
             
             # Load audio
-            y, sr = librosa.load(audio_path, sr=None)
+            key, y, sr = self._load(audio_path)
             
             # Use config default if not provided
             if threshold is None:
                 threshold = config.VOCAL_THRESHOLD
             
-            # Separate harmonic (vocal) and percussive components
-            y_harmonic, y_percussive = librosa.effects.hpss(y)
+            # Separate the harmonic (vocal) component - the percussive
+            # part is never used, so skip reconstructing it
+            y_harmonic = librosa.effects.harmonic(y).astype(np.float32, copy=False)
+            
+            # Single complex64 STFT shared by the mel and contrast features
+            S = np.abs(librosa.stft(y_harmonic, dtype=np.complex64))
             
             # Compute mel spectrogram for harmonic part
             mel_spect = librosa.feature.melspectrogram(
-                y=y_harmonic,
+                S=S ** 2,
                 sr=sr,
                 n_mels=128,
                 fmax=8000
@@ -123,10 +276,7 @@ class AudioAnalyzer:
             mel_spect_db = librosa.power_to_db(mel_spect, ref=np.max)
             
             # Compute spectral contrast
-            contrast = librosa.feature.spectral_contrast(
-                S=np.abs(librosa.stft(y_harmonic)),
-                sr=sr
-            )
+            contrast = librosa.feature.spectral_contrast(S=S, sr=sr)
             
             # Combine features
             feature_sum = np.mean(contrast, axis=0) + np.mean(mel_spect_db, axis=0)
@@ -157,7 +307,7 @@ class AudioAnalyzer:
             # Ensure minimum number of changes
             if len(vocal_times_list) < config.VOCAL_MIN_CHANGES:
                 # Fallback to onset detection with different parameters
-                onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+                onset_env = self._onset_strength(key, y, sr)
                 peaks = librosa.util.peak_pick(
                     onset_env,
                     pre_max=20,
@@ -202,35 +352,109 @@ class AudioAnalyzer:
             beat_times = self.analyze_beats(audio_path)
             vocal_times = self.analyze_vocal_changes(audio_path)
             
-            # Combine and sort
-            all_times = []
-            
-            # Add beats with weight
-            for beat_time in beat_times:
-                all_times.append((beat_time, beat_weight))
+            # Merge both sorted lists, dropping points within 0.1 seconds
+            merged_times = _merge_dedup(
+                np.asarray(beat_times, dtype=np.float64),
+                np.asarray(vocal_times, dtype=np.float64),
+                0.1
+            )
             
-            # Add vocals with weight
-            for vocal_time in vocal_times:
-                all_times.append((vocal_time, vocal_weight))
+            return merged_times.tolist()
+        
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error in hybrid analysis: {str(e)}")
+            return []
+    
+    def analyze_batch(
+        self,
+        audio_paths: List[str],
+        mode: str = 'beats',
+        workers: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Analyze many audio files in parallel worker processes
+        
+        Args:
+            audio_paths: List of audio file paths
+            mode: Analysis mode ('beats', 'vocals', 'hybrid')
+            workers: Number of worker processes (defaults to CPU count)
             
-            # Sort by time
-            all_times.sort(key=lambda x: x[0])
+        Returns:
+            List of timestamp lists, in the same order as audio_paths
+        """
+        worker = _BATCH_WORKERS.get(mode)
+        
+        if worker is None:
+            if config.DEBUG:
+                print(f"Unknown analysis mode: {mode}")
+            return [[] for _ in audio_paths]
+        
+        if not audio_paths:
+            return []
+        
+        workers = min(workers or os.cpu_count() or 1, len(audio_paths))
+        
+        # Single file - not worth spawning a pool
+        if workers == 1:
+            return [worker(path) for path in audio_paths]
+        
+        # Several files per task amortizes IPC, but keep enough tasks
+        # around to balance uneven file lengths across workers
+        chunksize = max(1, len(audio_paths) // (workers * 4))
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(worker, audio_paths, chunksize=chunksize))
+        
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error in batch analysis: {str(e)}")
+            return [[] for _ in audio_paths]
+    
+    def _fast_info(self, audio_path: str) -> Optional[Dict]:
+        """
+        Read duration/sample rate/channels from the file header
+        without decoding any audio
+        
+        Args:
+            audio_path: Path to audio file
             
-            # Merge nearby points (within 0.1 seconds)
-            merged_times = []
-            last_time = -1.0
+        Returns:
+            Dict with duration, sample_rate, channels, samples or None
+        """
+        import librosa
+        import soundfile
+        
+        try:
+            if not os.path.exists(audio_path):
+                return None
             
-            for time, weight in all_times:
-                if time - last_time > 0.1:
-                    merged_times.append(time)
-                    last_time = time
+            try:
+                info = soundfile.info(audio_path)
+                sr = info.samplerate
+                channels = info.channels
+                samples = info.frames
+                duration = info.frames / sr if sr else 0.0
+            except Exception:
+                # Formats libsndfile can't read (e.g. AAC/M4A) - librosa
+                # falls back to audioread, which still avoids a full decode
+                sr = librosa.get_samplerate(audio_path)
+                duration = librosa.get_duration(path=audio_path)
+                channels = 0
+                samples = int(round(duration * sr))
             
-            return merged_times
+            return {
+                'duration': duration,
+                'sample_rate': sr,
+                'samples': samples,
+                'channels': channels,
+            }
         
         except Exception as e:
             if config.DEBUG:
-                print(f"Error in hybrid analysis: {str(e)}")
-            return []
+                print(f"Error reading audio header: {str(e)}")
+            return None
     
     def get_audio_info(self, audio_path: str) -> Optional[Dict]:
         """
@@ -242,16 +466,17 @@ class AudioAnalyzer:
         Returns:
             Dict with audio info or None
         """
+        import librosa
+        
         try:
-            if not os.path.exists(audio_path):
+            info = self._fast_info(audio_path)
+            
+            if info is None:
                 return None
             
-            # Load audio
+            # Tempo and spectral features need the decoded signal
             y, sr = librosa.load(audio_path, sr=None)
             
-            # Get duration
-            duration = librosa.get_duration(y=y, sr=sr)
-            
             # Estimate tempo
             tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
             
@@ -260,11 +485,8 @@ class AudioAnalyzer:
             spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)
             
             return {
-                'duration': duration,
-                'sample_rate': sr,
+                **info,
                 'tempo': float(tempo),
-                'samples': len(y),
-                'channels': 1,  # librosa loads as mono by default
                 'spectral_centroid_mean': float(np.mean(spectral_centroids)),
                 'spectral_rolloff_mean': float(np.mean(spectral_rolloff)),
             }
@@ -285,7 +507,7 @@ class AudioAnalyzer:
             Duration in seconds, or 0.0 if error
         """
         try:
-            info = self.get_audio_info(audio_path)
+            info = self._fast_info(audio_path)
             return info['duration'] if info else 0.0
         except Exception:
             return 0.0
@@ -301,12 +523,45 @@ class AudioAnalyzer:
             True if valid, False otherwise
         """
         try:
-            info = self.get_audio_info(audio_path)
+            info = self._fast_info(audio_path)
             return info is not None and info['duration'] > 0
         except Exception:
             return False
 
 
+# Shared instance for the module-level functions, so its decode/onset
+# caches (and Numba's compiled merge) survive between calls
+_DEFAULT_ANALYZER: Optional[AudioAnalyzer] = None
+
+
+def _analyzer() -> AudioAnalyzer:
+    """Get the shared AudioAnalyzer, creating it on first use"""
+    global _DEFAULT_ANALYZER
+    if _DEFAULT_ANALYZER is None:
+        _DEFAULT_ANALYZER = AudioAnalyzer()
+    return _DEFAULT_ANALYZER
+
+
+# Top-level workers so ProcessPoolExecutor can pickle them
+def _worker_beats(audio_path: str) -> List[float]:
+    return _analyzer().analyze_beats(audio_path)
+
+
+def _worker_vocals(audio_path: str) -> List[float]:
+    return _analyzer().analyze_vocal_changes(audio_path)
+
+
+def _worker_hybrid(audio_path: str) -> List[float]:
+    return _analyzer().analyze_hybrid(audio_path)
+
+
+_BATCH_WORKERS = {
+    'beats': _worker_beats,
+    'vocals': _worker_vocals,
+    'hybrid': _worker_hybrid,
+}
+
+
 def detect_beats(audio_path: str, hop_length: int = None) -> List[float]:
     """
     Main function to detect beats in audio
@@ -318,7 +573,7 @@ def detect_beats(audio_path: str, hop_length: int = None) -> List[float]:
     Returns:
         List of beat timestamps in seconds
     """
-    analyzer = AudioAnalyzer()
+    analyzer = _analyzer()
     return analyzer.analyze_beats(audio_path, hop_length=hop_length)
 
 
@@ -333,7 +588,7 @@ def detect_vocal_changes(audio_path: str, threshold: float = None) -> List[float
     Returns:
         List of vocal change timestamps in seconds
     """
-    analyzer = AudioAnalyzer()
+    analyzer = _analyzer()
     return analyzer.analyze_vocal_changes(audio_path, threshold=threshold)
 
 
@@ -353,7 +608,7 @@ def analyze_audio(
     Returns:
         List of timestamps in seconds
     """
-    analyzer = AudioAnalyzer()
+    analyzer = _analyzer()
     
     if mode == 'beats':
         return analyzer.analyze_beats(audio_path, **kwargs)
@@ -367,6 +622,26 @@ def analyze_audio(
         return []
 
 
+def analyze_audio_batch(
+    audio_paths: List[str],
+    mode: str = 'beats',
+    workers: Optional[int] = None
+) -> List[List[float]]:
+    """
+    Analyze multiple audio files in parallel
+    
+    Args:
+        audio_paths: List of audio file paths
+        mode: Analysis mode ('beats', 'vocals', 'hybrid')
+        workers: Number of worker processes (defaults to CPU count)
+        
+    Returns:
+        List of timestamp lists, one per input file
+    """
+    analyzer = _analyzer()
+    return analyzer.analyze_batch(audio_paths, mode=mode, workers=workers)
+
+
 def get_audio_duration(audio_path: str) -> float:
     """
     Get audio file duration
@@ -377,7 +652,7 @@ def get_audio_duration(audio_path: str) -> float:
     Returns:
         Duration in seconds
     """
-    analyzer = AudioAnalyzer()
+    analyzer = _analyzer()
     return analyzer.get_audio_duration(audio_path)
 
 
@@ -391,5 +666,5 @@ def get_audio_info(audio_path: str) -> Optional[Dict]:
     Returns:
         Dict with audio info or None
     """
-    analyzer = AudioAnalyzer()
+    analyzer = _analyzer()
     return analyzer.get_audio_info(audio_path)
\ No newline at end of file
@@ -4,13 +4,16 @@ Handles concatenation with proper audio sync
 """
 
 import os
+import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 import ffmpeg
 
 import config
+from utils.ffmpeg_helper import get_video_encoder_args
 
 
 class VideoCombiner:
@@ -20,6 +23,103 @@ class VideoCombiner:
         """Initialize video combiner"""
         self.temp_dir = config.TEMP_DIR
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        # Probe results keyed by path, tagged with mtime so rewritten files are re-probed
+        self._probe_cache: Dict[str, Tuple[int, Dict]] = {}
+        self._meta_cache: Dict[str, Tuple[int, Dict]] = {}
+    
+    def _probe(self, video_path: str, mtime: Optional[int] = None) -> Dict:
+        """
+        Probe a video file, reusing a cached result when the file is unchanged
+        
+        Args:
+            video_path: Path to video file
+            mtime: File mtime in ns if the caller already stat'd it
+            
+        Returns:
+            FFprobe output dict
+        """
+        if mtime is None:
+            mtime = os.stat(video_path).st_mtime_ns
+        cached = self._probe_cache.get(video_path)
+        
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        probe = ffmpeg.probe(video_path)
+        self._probe_cache[video_path] = (mtime, probe)
+        return probe
+    
+    def _meta(self, video_path: str) -> Dict:
+        """
+        Existence check plus the stream parameters merging cares about
+        (one stat and at most one ffprobe per unchanged file)
+        
+        Args:
+            video_path: Path to video file
+            
+        Returns:
+            Dict with exists, duration, codec, width, height, fps
+            (stream fields are None if the file couldn't be probed)
+        """
+        try:
+            mtime = os.stat(video_path).st_mtime_ns
+        except OSError:
+            return {'exists': False}
+        
+        cached = self._meta_cache.get(video_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        meta = {
+            'exists': True,
+            'duration': None,
+            'codec': None,
+            'width': None,
+            'height': None,
+            'fps': None,
+        }
+        
+        try:
+            probe = self._probe(video_path, mtime)
+            meta['duration'] = float(probe['format']['duration'])
+            
+            video_stream = next(
+                (s for s in probe['streams'] if s['codec_type'] == 'video'),
+                None
+            )
+            if video_stream:
+                num, _, den = video_stream.get('r_frame_rate', '0/1').partition('/')
+                meta['codec'] = video_stream.get('codec_name')
+                meta['width'] = video_stream.get('width')
+                meta['height'] = video_stream.get('height')
+                meta['fps'] = int(num) / int(den) if den and int(den) else None
+        
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error probing {video_path}: {str(e)}")
+        
+        self._meta_cache[video_path] = (mtime, meta)
+        return meta
+    
+    def _meta_batch(self, video_paths: List[str]) -> List[Dict]:
+        """
+        Run _meta over all videos concurrently (stat/ffprobe are IO bound)
+        
+        Args:
+            video_paths: List of video paths
+            
+        Returns:
+            List of metadata dicts, in input order
+        """
+        if len(video_paths) <= 1:
+            return [self._meta(p) for p in video_paths]
+        
+        with ThreadPoolExecutor(max_workers=min(16, len(video_paths))) as executor:
+            return list(executor.map(self._meta, video_paths))
+    
+    def _probe_duration(self, video_path: str) -> float:
+        """Get video duration in seconds from the (cached) probe"""
+        return float(self._probe(video_path)['format']['duration'])
     
     def merge(
         self,
@@ -48,9 +148,11 @@ class VideoCombiner:
             if len(video_paths) == 1:
                 return video_paths[0]
             
-            # Verify all videos exist
-            for video_path in video_paths:
-                if not os.path.exists(video_path):
+            # Verify all videos exist (probed in parallel; the results are
+            # cached for the concat and transition paths)
+            metas = self._meta_batch(video_paths)
+            for video_path, meta in zip(video_paths, metas):
+                if not meta['exists']:
                     if config.DEBUG:
                         print(f"Video not found: {video_path}")
                     return None
@@ -61,11 +163,13 @@ class VideoCombiner:
             
             # Choose merge method based on transition
             if transition:
+                durations = [meta['duration'] for meta in metas]
                 return self._merge_with_transition(
                     video_paths,
                     output_path,
                     transition,
-                    transition_duration
+                    transition_duration,
+                    durations=None if None in durations else durations
                 )
             else:
                 return self._merge_simple_concat(video_paths, output_path)
@@ -92,39 +196,24 @@ class VideoCombiner:
             Output path or None
         """
         try:
-            # Create concat file
-            concat_file = self.temp_dir / "concat_list.txt"
-            
-            with open(concat_file, 'w') as f:
-                for video_path in video_paths:
-                    # Write absolute path
-                    abs_path = os.path.abspath(video_path)
-                    f.write(f"file '{abs_path}'\n")
-            
-            # Run FFmpeg concat
-            cmd = [
-                'ffmpeg',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', str(concat_file),
-                '-c', 'copy',  # Copy streams (no re-encoding)
-                '-y',  # Overwrite output
-                output_path
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True
-            )
-            
-            # Clean up concat file
-            if concat_file.exists():
-                concat_file.unlink()
-            
-            if result.returncode == 0 and os.path.exists(output_path):
+            if self._run_concat_demuxer(video_paths, output_path):
                 return output_path
             
+            # Inputs with identical stream parameters usually only trip over
+            # timestamps - regenerate them and stream copy again
+            if self._streams_uniform(video_paths):
+                if config.DEBUG:
+                    print("Concat demuxer failed, retrying with regenerated timestamps...")
+                
+                if self._run_concat_demuxer(video_paths, output_path, genpts=True):
+                    return output_path
+                
+                # Container-level join rewrites parameter sets without
+                # touching the compressed bitstream
+                merged = self._merge_bitstream(video_paths, output_path)
+                if merged:
+                    return merged
+            
             # If concat failed, try re-encoding method
             if config.DEBUG:
                 print("Concat demuxer failed, trying re-encode method...")
@@ -136,6 +225,165 @@ class VideoCombiner:
                 print(f"Error in simple concat: {str(e)}")
             return self._merge_with_reencoding(video_paths, output_path)
     
+    def _run_concat_demuxer(
+        self,
+        video_paths: List[str],
+        output_path: str,
+        genpts: bool = False
+    ) -> bool:
+        """
+        Stream-copy videos with the FFmpeg concat demuxer, feeding the
+        file list through stdin instead of a temp file
+        
+        Args:
+            video_paths: List of video paths
+            output_path: Output path
+            genpts: Regenerate presentation timestamps
+            
+        Returns:
+            True if FFmpeg succeeded
+        """
+        # Absolute paths, with quotes escaped for the concat list syntax
+        concat_list = ''.join(
+            "file '{}'\n".format(os.path.abspath(p).replace("'", "'\\''"))
+            for p in video_paths
+        )
+        
+        cmd = [
+            'ffmpeg',
+            '-f', 'concat',
+            '-safe', '0',
+            '-protocol_whitelist', 'file,pipe',
+        ]
+        if genpts:
+            cmd.extend(['-fflags', '+genpts'])
+        cmd.extend([
+            '-i', 'pipe:0',
+            '-c', 'copy',  # Copy streams (no re-encoding)
+            '-y',  # Overwrite output
+            output_path
+        ])
+        
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        _, stderr = process.communicate(concat_list.encode())
+        
+        if process.returncode != 0 and config.DEBUG:
+            print(f"FFmpeg stderr: {stderr.decode(errors='replace')}")
+        
+        return process.returncode == 0 and os.path.exists(output_path)
+    
+    def _merge_bitstream(
+        self,
+        video_paths: List[str],
+        output_path: str
+    ) -> Optional[str]:
+        """
+        Join videos at the container level with mkvmerge or MP4Box
+        (no re-encoding; requires all inputs to share codec parameters)
+        
+        Args:
+            video_paths: List of video paths
+            output_path: Output path
+            
+        Returns:
+            Output path or None if no tool is installed or joining failed
+        """
+        try:
+            if shutil.which('mkvmerge'):
+                # Unique per call so concurrent merges never share a temp file
+                with tempfile.NamedTemporaryFile(
+                    dir=str(self.temp_dir), suffix='.mkv', delete=False
+                ) as tf:
+                    temp_mkv = Path(tf.name)
+                
+                cmd = ['mkvmerge', '-q', '-o', str(temp_mkv), video_paths[0]]
+                cmd.extend(f'+{video_path}' for video_path in video_paths[1:])
+                
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                
+                try:
+                    # mkvmerge exits with 1 on warnings, 2 on errors
+                    if result.returncode in (0, 1) and temp_mkv.exists():
+                        result = subprocess.run(
+                            ['ffmpeg', '-i', str(temp_mkv), '-c', 'copy', '-y', output_path],
+                            capture_output=True,
+                            text=True
+                        )
+                        if result.returncode == 0 and os.path.exists(output_path):
+                            return output_path
+                finally:
+                    if temp_mkv.exists():
+                        temp_mkv.unlink()
+            
+            elif shutil.which('MP4Box'):
+                cmd = ['MP4Box']
+                for video_path in video_paths:
+                    cmd.extend(['-cat', video_path])
+                cmd.extend(['-new', output_path])
+                
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                
+                if result.returncode == 0 and os.path.exists(output_path):
+                    return output_path
+            
+            if config.DEBUG:
+                print("Bitstream concatenation unavailable or failed")
+            
+            return None
+        
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error in bitstream concat: {str(e)}")
+            return None
+    
+    def _probe_all(self, video_paths: List[str]) -> List[Dict]:
+        """
+        Probe every video (cached per path)
+        
+        Args:
+            video_paths: List of video paths
+            
+        Returns:
+            List of ffprobe output dicts, in input order
+        """
+        return [self._probe(video_path) for video_path in video_paths]
+    
+    def _streams_uniform(self, video_paths: List[str]) -> bool:
+        """
+        Check whether all videos share codec and stream parameters,
+        i.e. whether they can be joined without re-encoding
+        
+        Args:
+            video_paths: List of video paths
+            
+        Returns:
+            True if every input has identical stream parameters
+        """
+        keys = ('codec_name', 'width', 'height', 'r_frame_rate', 'sample_rate', 'channels')
+        
+        try:
+            signatures = set()
+            for probe in self._probe_all(video_paths):
+                streams = sorted(
+                    probe.get('streams', []),
+                    key=lambda s: s.get('codec_type', '')
+                )
+                signatures.add(tuple(
+                    (s.get('codec_type'),) + tuple(s.get(k) for k in keys)
+                    for s in streams
+                ))
+            return len(signatures) == 1
+        
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error comparing video streams: {str(e)}")
+            return False
+    
     def _merge_with_reencoding(
         self,
         video_paths: List[str],
@@ -175,9 +423,7 @@ class VideoCombiner:
                 '-filter_complex', filter_complex,
                 '-map', '[outv]',
                 '-map', '[outa]',
-                '-c:v', config.VIDEO_CODEC,
-                '-preset', config.VIDEO_PRESET,
-                '-crf', str(config.VIDEO_CRF),
+                *get_video_encoder_args(),
                 '-c:a', config.AUDIO_CODEC,
                 '-b:a', config.AUDIO_BITRATE,
                 '-movflags', 'faststart',
@@ -209,7 +455,8 @@ class VideoCombiner:
         video_paths: List[str],
         output_path: str,
         transition: str,
-        duration: float
+        duration: float,
+        durations: Optional[List[float]] = None
     ) -> Optional[str]:
         """
         Merge videos with transitions (fade, dissolve)
@@ -219,17 +466,17 @@ class VideoCombiner:
             output_path: Output path
             transition: Transition type
             duration: Transition duration
+            durations: Known duration of each video (probed if None)
             
         Returns:
             Output path or None
         """
         try:
             # Get duration of each video
-            video_durations = []
-            for video_path in video_paths:
-                probe = ffmpeg.probe(video_path)
-                duration_val = float(probe['format']['duration'])
-                video_durations.append(duration_val)
+            if durations is None:
+                video_durations = [self._probe_duration(p) for p in video_paths]
+            else:
+                video_durations = list(durations)
             
             # Build complex filter for transitions
             filter_parts = []
@@ -278,15 +525,26 @@ class VideoCombiner:
         
         for video_path in video_paths:
             try:
-                probe = ffmpeg.probe(video_path)
-                duration = float(probe['format']['duration'])
-                total_duration += duration
+                total_duration += self._probe_duration(video_path)
             except Exception:
                 pass
         
         return total_duration
 
 
+# Shared instance for the module-level functions, so its probe cache
+# carries over between calls
+_DEFAULT_COMBINER: Optional[VideoCombiner] = None
+
+
+def _combiner() -> VideoCombiner:
+    """Get the shared VideoCombiner, creating it on first use"""
+    global _DEFAULT_COMBINER
+    if _DEFAULT_COMBINER is None:
+        _DEFAULT_COMBINER = VideoCombiner()
+    return _DEFAULT_COMBINER
+
+
 def merge_videos(
     video_paths: List[str],
     output_path: Optional[str] = None,
@@ -303,7 +561,7 @@ def merge_videos(
     Returns:
         Path to merged video or None if failed
     """
-    combiner = VideoCombiner()
+    combiner = _combiner()
     return combiner.merge(video_paths, output_path, transition)
 
 
@@ -326,7 +584,7 @@ def concatenate_segments(
         Path to output video or None if failed
     """
     try:
-        combiner = VideoCombiner()
+        combiner = _combiner()
         
         # First merge the segments
         merged = combiner.merge(segment_paths, output_path)
@@ -336,11 +594,16 @@ def concatenate_segments(
         
         # If audio provided, add it
         if audio_path and os.path.exists(audio_path):
-            temp_output = str(Path(output_path).parent / f"temp_{Path(output_path).name}")
+            with tempfile.NamedTemporaryFile(
+                dir=str(Path(output_path).parent),
+                prefix='temp_',
+                suffix=Path(output_path).suffix,
+                delete=False
+            ) as tf:
+                temp_output = tf.name
             
             # Get video duration
-            probe = ffmpeg.probe(merged)
-            video_duration = float(probe['format']['duration'])
+            video_duration = combiner._probe_duration(merged)
             
             # Add audio with proper timing
             cmd = [
@@ -359,11 +622,15 @@ def concatenate_segments(
                 temp_output
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0 and os.path.exists(temp_output):
-                # Replace original with audio version
-                os.replace(temp_output, output_path)
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                
+                if result.returncode == 0 and os.path.exists(temp_output):
+                    # Replace original with audio version
+                    os.replace(temp_output, output_path)
+            finally:
+                if os.path.exists(temp_output):
+                    os.unlink(temp_output)
         
         return output_path
     
@@ -383,5 +650,5 @@ def get_total_duration(video_paths: List[str]) -> float:
     Returns:
         Total duration in seconds
     """
-    combiner = VideoCombiner()
+    combiner = _combiner()
     return combiner.get_combined_duration(video_paths)
\ No newline at end of file
@@ -4,18 +4,138 @@ Overlay images on video with animations
 Uses position animations + enable expressions (no fade filters to avoid timing conflicts)
 """
 
+import hashlib
 import os
 import random
-import subprocess
-from pathlib import Path
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Optional, Tuple, Dict
 import ffmpeg
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional - image sizes fall back to ffprobe
+    Image = None
 
 import config
-from utils.ffmpeg_helper import get_video_info, get_video_duration, get_video_resolution
+from utils.ffmpeg_helper import (
+    get_video_info, get_video_duration, get_video_resolution,
+    get_video_encoder_args, run_ffmpeg,
+)
 from utils.file_manager import FileManager
 
 
+# Image extensions as a set for O(1) membership tests
+IMAGE_EXTENSIONS = frozenset(config.IMAGE_EXTENSIONS)
+
+# Animations picked from when animation_style is 'random'
+RANDOM_ANIMATIONS = ('slide_bottom', 'slide_left', 'slide_right', 'slide_top', 'fade')
+
+# Filter graphs longer than this are passed via -filter_complex_script
+# (keeps argv small; Linux caps a single argument at 128 KiB)
+FILTER_SCRIPT_THRESHOLD = 8000
+
+# Position expression for slide animations: off-screen before start, slide in,
+# hold at the centre, slide back out. Branchless - both ramps are clipped to
+# [0, 1] and blended with lerp. Filled with str.format per image.
+SLIDE_EXPR = (
+    "lerp("
+    "lerp({off},{center},clip((t-{start})/{anim},0,1)),"  # Entry animation
+    "{off},clip((t-{exit_start})/{anim},0,1)"  # Exit animation
+    ")"
+)
+
+# Timelines with at least this many images use the Numba-compiled
+# _compute_timeline_py. Below it NumPy alone is faster than the one-off
+# import/JIT (or cache load) cost. Numba is imported lazily, the first
+# time a timeline this long is computed.
+TIMELINE_JIT_THRESHOLD = 4096
+
+_compute_timeline_jit = None
+
+
+def _compute_timeline(
+    num_images: int,
+    duration_per_image: float,
+    delay: float,
+    video_duration: float
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """_compute_timeline_py, Numba-compiled for long timelines"""
+    global _compute_timeline_jit
+    
+    if num_images < TIMELINE_JIT_THRESHOLD:
+        return _compute_timeline_py(num_images, duration_per_image, delay, video_duration)
+    
+    if _compute_timeline_jit is None:
+        from numba import njit
+        _compute_timeline_jit = njit(cache=True)(_compute_timeline_py)
+    
+    return _compute_timeline_jit(num_images, duration_per_image, delay, video_duration)
+
+
+def _compute_timeline_py(
+    num_images: int,
+    duration_per_image: float,
+    delay: float,
+    video_duration: float
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Start/end time of each image (delay after each image except the last),
+    scaled down proportionally if the timeline exceeds the video.
+    Returns (starts, ends, scale_factor)
+    """
+    starts = np.arange(num_images) * (duration_per_image + delay)
+    ends = starts + duration_per_image
+    scale_factor = 1.0
+    
+    total_time = ends[-1]
+    if total_time > video_duration:
+        scale_factor = video_duration / total_time
+        starts = starts * scale_factor
+        ends = ends * scale_factor
+    
+    return starts, ends, scale_factor
+
+
+@lru_cache(maxsize=256)
+def _fit_image_size(
+    img_width: int,
+    img_height: int,
+    max_width: int,
+    max_height: int
+) -> Tuple[int, int]:
+    """
+    Target size for an image within max_width x max_height
+    (unchanged if it fits, else scaled down keeping aspect ratio)
+    """
+    # Check if image exceeds max dimensions
+    if img_width <= max_width and img_height <= max_height:
+        # Image fits within bounds - no resize needed
+        return img_width, img_height
+    
+    # Image is too large - resize maintaining aspect ratio
+    img_aspect = img_width / img_height
+    max_aspect = max_width / max_height
+    
+    if img_aspect > max_aspect:
+        # Image is wider - fit to max width
+        target_width = max_width
+        target_height = int(max_width / img_aspect)
+    else:
+        # Image is taller - fit to max height
+        target_height = max_height
+        target_width = int(max_height * img_aspect)
+    
+    # Ensure dimensions are even (required by some codecs)
+    target_width = target_width - (target_width % 2)
+    target_height = target_height - (target_height % 2)
+    
+    return target_width, target_height
+
+
 class ImageOverlayProcessor:
     """Handler for overlaying images on video with animations"""
     
@@ -24,6 +144,9 @@ class ImageOverlayProcessor:
         self.temp_dir = config.TEMP_DIR
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         self.file_manager = FileManager()
+        
+        # Pre-resized overlay images, reused across runs
+        self.resize_cache_dir = self.temp_dir / "overlay_cache"
     
     def process(
         self,
@@ -33,7 +156,9 @@ class ImageOverlayProcessor:
         duration_per_image: Optional[float] = None,
         delay_between_images: float = 0.0,
         animation_style: str = 'random',
-        animation_duration: float = None
+        animation_duration: float = None,
+        threads: Optional[int] = None,
+        is_final: bool = True
     ) -> Optional[str]:
         """
         Overlay images from folder onto video with animations
@@ -47,18 +172,31 @@ class ImageOverlayProcessor:
             animation_style: Animation type ('slide_bottom', 'slide_left', 'slide_right', 
                            'slide_top', 'fade', 'random')
             animation_duration: Duration of animation in seconds (uses config default if None)
+            threads: FFmpeg encoder threads (uses config.FFMPEG_THREADS if None)
+            is_final: Output is a deliverable (moves the moov atom to the front
+                      for streaming); pass False for intermediate files
             
         Returns:
             Path to output video or None if failed
         """
         try:
-            # Validate inputs
-            if not os.path.exists(video_path):
+            # Validate inputs (one stat per path)
+            try:
+                video_ok = stat.S_ISREG(os.stat(video_path).st_mode)
+            except OSError:
+                video_ok = False
+            
+            if not video_ok:
                 if config.DEBUG:
                     print(f"Video not found: {video_path}")
                 return None
             
-            if not os.path.exists(images_folder):
+            try:
+                folder_ok = stat.S_ISDIR(os.stat(images_folder).st_mode)
+            except OSError:
+                folder_ok = False
+            
+            if not folder_ok:
                 if config.DEBUG:
                     print(f"Images folder not found: {images_folder}")
                 return None
@@ -97,8 +235,9 @@ class ImageOverlayProcessor:
             if animation_duration is None:
                 animation_duration = config.IMAGE_ANIMATION_DURATION
             
-            # Build FFmpeg filter complex
-            filter_complex = self._build_filter_complex(
+            # Build FFmpeg filter complex (images may be swapped for
+            # pre-resized copies)
+            filter_complex, input_paths = self._build_filter_complex(
                 image_paths=image_paths,
                 video_width=video_width,
                 video_height=video_height,
@@ -115,9 +254,12 @@ class ImageOverlayProcessor:
             # Execute FFmpeg command
             success = self._execute_ffmpeg(
                 video_path=video_path,
-                image_paths=image_paths,
+                image_paths=input_paths,
                 filter_complex=filter_complex,
-                output_path=output_path
+                output_path=output_path,
+                timing_info=timing_info,
+                threads=threads,
+                is_final=is_final
             )
             
             if success and os.path.exists(output_path):
@@ -132,6 +274,45 @@ class ImageOverlayProcessor:
                 traceback.print_exc()
             return None
     
+    def process_batch(
+        self,
+        jobs: List[Dict],
+        max_workers: Optional[int] = None
+    ) -> List[Optional[str]]:
+        """
+        Overlay images on several videos, running FFmpeg jobs concurrently
+        
+        Each FFmpeg gets an equal share of config.FFMPEG_THREADS so the
+        total thread count stays close to the core count.
+        
+        Args:
+            jobs: List of dicts of process() keyword arguments
+                  (video_path, images_folder, output_path, ...)
+            max_workers: Concurrent FFmpeg processes (defaults to half the CPU count)
+            
+        Returns:
+            List of output paths (None for failed jobs), in job order
+        """
+        if not jobs:
+            return []
+        
+        if max_workers is None:
+            max_workers = (os.cpu_count() or 2) // 2
+        max_workers = max(1, min(max_workers, len(jobs)))
+        
+        if max_workers == 1:
+            return [self.process(**job) for job in jobs]
+        
+        threads = max(1, config.FFMPEG_THREADS // max_workers)
+        
+        # Threads are enough here: each worker just waits on its ffmpeg
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.process, **{'threads': threads, **job})
+                for job in jobs
+            ]
+            return [future.result() for future in futures]
+    
     def _load_images_from_folder(self, folder_path: str) -> List[str]:
         """
         Load all valid images from folder (sorted alphabetically)
@@ -142,17 +323,18 @@ class ImageOverlayProcessor:
         Returns:
             List of image file paths
         """
-        image_paths = []
-        
         try:
-            folder = Path(folder_path)
+            # DirEntry carries the file type from readdir, so is_file()
+            # needs no extra stat for regular files
+            with os.scandir(folder_path) as entries:
+                image_paths = [
+                    entry.path
+                    for entry in entries
+                    if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+                    and entry.is_file()
+                ]
             
-            # Get all files
-            for item in sorted(folder.iterdir()):
-                if item.is_file():
-                    ext = item.suffix.lower()
-                    if ext in config.IMAGE_EXTENSIONS:
-                        image_paths.append(str(item))
+            image_paths.sort()
             
             if config.VERBOSE:
                 print(f"Found {len(image_paths)} images in folder")
@@ -206,35 +388,26 @@ class ImageOverlayProcessor:
                     if config.VERBOSE:
                         print(f"Warning: Setting minimum duration of 1.0s per image")
             
-            # Calculate start and end times for each image
-            start_times = []
-            end_times = []
-            current_time = 0.0
-            
-            for i in range(num_images):
-                start_times.append(current_time)
-                current_time += duration_per_image
-                end_times.append(current_time)
-                
-                # Add delay after each image except the last one
-                if i < num_images - 1:
-                    current_time += delay_between_images
-            
-            # Check if we exceed video duration
-            total_time = end_times[-1]
+            # Calculate start and end times for each image, scaled down
+            # proportionally if they exceed the video duration
+            starts, ends, scale_factor = _compute_timeline(
+                num_images,
+                float(duration_per_image),
+                float(delay_between_images),
+                float(video_duration)
+            )
+            total_time = float(ends[-1])
             
-            if total_time > video_duration:
-                # Scale everything down proportionally
-                scale_factor = video_duration / total_time
-                
+            if scale_factor < 1.0:
                 if config.VERBOSE:
                     print(f"Timeline exceeds video duration, scaling by {scale_factor:.3f}")
                 
-                start_times = [t * scale_factor for t in start_times]
-                end_times = [t * scale_factor for t in end_times]
                 duration_per_image = duration_per_image * scale_factor
                 total_time = video_duration
             
+            start_times = starts.tolist()
+            end_times = ends.tolist()
+            
             if config.VERBOSE:
                 print(f"\n=== TIMING INFO ===")
                 print(f"Number of images: {num_images}")
@@ -259,6 +432,96 @@ class ImageOverlayProcessor:
                 print(f"Error calculating timing: {str(e)}")
             return None
     
+    def _read_image_size(self, image_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Read image width/height from the file header
+        
+        Args:
+            image_path: Path to image
+            
+        Returns:
+            Tuple of (width, height) or None if unreadable
+        """
+        if Image is not None:
+            try:
+                # Image.open is lazy - only the header is parsed
+                with Image.open(image_path) as img:
+                    return img.size
+            except Exception as e:
+                if config.DEBUG:
+                    print(f"PIL could not read {image_path}, using ffprobe: {str(e)}")
+        
+        # Get image dimensions using ffprobe
+        probe = ffmpeg.probe(image_path)
+        
+        # Find video stream (images are treated as video by ffprobe)
+        img_stream = next(
+            (stream for stream in probe['streams'] if stream['codec_type'] == 'video'),
+            None
+        )
+        
+        if not img_stream:
+            return None
+        
+        return int(img_stream['width']), int(img_stream['height'])
+    
+    def _prepare_image(
+        self,
+        image_path: str,
+        target_width: int,
+        target_height: int
+    ) -> Optional[str]:
+        """
+        Resize an image to its exact overlay size once, cached on disk
+        
+        The cache key is the source path, mtime, size and target dimensions,
+        so an edited image or a different video resolution gets a new file.
+        
+        Args:
+            image_path: Path to image
+            target_width: Target width
+            target_height: Target height
+            
+        Returns:
+            Path to the resized RGBA PNG, or None if Pillow is unavailable
+            or the image could not be converted
+        """
+        if Image is None:
+            return None
+        
+        try:
+            st = os.stat(image_path)
+            key = hashlib.sha1(
+                f"{os.path.abspath(image_path)}:{st.st_mtime_ns}:{st.st_size}:"
+                f"{target_width}x{target_height}".encode()
+            ).hexdigest()
+            cached_path = self.resize_cache_dir / f"{key}.png"
+            
+            if cached_path.exists():
+                return str(cached_path)
+            
+            self.resize_cache_dir.mkdir(parents=True, exist_ok=True)
+            
+            with Image.open(image_path) as img:
+                img = img.convert('RGBA')
+                if img.size != (target_width, target_height):
+                    img = img.resize((target_width, target_height), Image.LANCZOS)
+                
+                # Write then rename so concurrent jobs never see a partial file
+                with tempfile.NamedTemporaryFile(
+                    suffix='.png', delete=False, dir=str(self.resize_cache_dir)
+                ) as f:
+                    img.save(f, format='PNG')
+                    tmp_path = f.name
+            
+            os.replace(tmp_path, cached_path)
+            return str(cached_path)
+        
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Could not pre-resize {image_path}, scaling in FFmpeg: {str(e)}")
+            return None
+    
     def _calculate_image_dimensions(
         self,
         image_path: str,
@@ -277,60 +540,26 @@ class ImageOverlayProcessor:
         Returns:
             Tuple of (target_width, target_height)
         """
+        # Calculate max allowed dimensions (85% of frame)
+        ratio = config.IMAGE_MAX_SIZE_RATIO
+        max_width = int(video_width * ratio)
+        max_height = int(video_height * ratio)
+        
         try:
-            # Get image dimensions using ffprobe
-            probe = ffmpeg.probe(image_path)
+            size = self._read_image_size(image_path)
             
-            # Find video stream (images are treated as video by ffprobe)
-            img_stream = next(
-                (stream for stream in probe['streams'] if stream['codec_type'] == 'video'),
-                None
-            )
-            
-            if not img_stream:
+            if not size:
                 # Fallback to max allowed size
-                max_width = int(video_width * config.IMAGE_MAX_SIZE_RATIO)
-                max_height = int(video_height * config.IMAGE_MAX_SIZE_RATIO)
                 return max_width, max_height
             
-            img_width = int(img_stream['width'])
-            img_height = int(img_stream['height'])
-            
-            # Calculate max allowed dimensions (85% of frame)
-            max_width = int(video_width * config.IMAGE_MAX_SIZE_RATIO)
-            max_height = int(video_height * config.IMAGE_MAX_SIZE_RATIO)
-            
-            # Check if image exceeds max dimensions
-            if img_width <= max_width and img_height <= max_height:
-                # Image fits within bounds - no resize needed
-                return img_width, img_height
-            
-            # Image is too large - resize maintaining aspect ratio
-            img_aspect = img_width / img_height
-            max_aspect = max_width / max_height
-            
-            if img_aspect > max_aspect:
-                # Image is wider - fit to max width
-                target_width = max_width
-                target_height = int(max_width / img_aspect)
-            else:
-                # Image is taller - fit to max height
-                target_height = max_height
-                target_width = int(max_height * img_aspect)
-            
-            # Ensure dimensions are even (required by some codecs)
-            target_width = target_width - (target_width % 2)
-            target_height = target_height - (target_height % 2)
-            
-            return target_width, target_height
+            # Images often share a resolution - the fit is memoized by value
+            return _fit_image_size(size[0], size[1], max_width, max_height)
         
         except Exception as e:
             if config.DEBUG:
                 print(f"Error calculating dimensions for {image_path}: {str(e)}")
             
             # Fallback
-            max_width = int(video_width * config.IMAGE_MAX_SIZE_RATIO)
-            max_height = int(video_height * config.IMAGE_MAX_SIZE_RATIO)
             return max_width, max_height
     
     def _build_filter_complex(
@@ -341,7 +570,7 @@ class ImageOverlayProcessor:
         timing_info: Dict,
         animation_style: str,
         animation_duration: float
-    ) -> str:
+    ) -> Tuple[str, List[str]]:
         """
         Build FFmpeg filter_complex for all image overlays
         Uses ONLY position animations and enable expressions (no fade filters)
@@ -355,41 +584,48 @@ class ImageOverlayProcessor:
             animation_duration: Animation duration
             
         Returns:
-            filter_complex string
+            Tuple of (filter_complex string, image input paths for FFmpeg)
         """
-        filters = []
+        # Every fragment of the graph goes into one flat list, joined once
+        parts = []
         
         start_times = timing_info['start_times']
         end_times = timing_info['end_times']
         
-        # STEP 1: Scale and prepare all images
-        for i, img_path in enumerate(image_paths):
-            # Calculate dimensions
-            img_width, img_height = self._calculate_image_dimensions(
-                img_path,
-                video_width,
-                video_height
-            )
-            
-            # Scale and add alpha channel for transparency support
-            # format=yuva420p adds alpha channel
-            scale_filter = (
-                f"[{i + 1}:v]"
-                f"scale={img_width}:{img_height}:force_original_aspect_ratio=decrease,"
-                f"format=yuva420p"
-                f"[img{i}]"
-            )
-            filters.append(scale_filter)
+        # Probe each image up front and pre-resize it to its target size
+        # (cached on disk). Reads are IO bound (file header or ffprobe) and
+        # Pillow releases the GIL while resizing, so fan out to threads
+        def prepare(img_path: str) -> Tuple[Tuple[int, int], Optional[str]]:
+            size = self._calculate_image_dimensions(img_path, video_width, video_height)
+            return size, self._prepare_image(img_path, *size)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(image_paths)))) as executor:
+            prepared = list(executor.map(prepare, image_paths))
         
-        # STEP 2: Build overlay chain with position-based animations
+        input_paths = [
+            resized_path or img_path
+            for img_path, (_, resized_path) in zip(image_paths, prepared)
+        ]
+        
+        # Single pass: per image, one chain that brings it to size and
+        # overlays it onto the running layer with position-based animations
         current_layer = "[0:v]"
         
-        for i, img_path in enumerate(image_paths):
-            img_width, img_height = self._calculate_image_dimensions(
-                img_path,
-                video_width,
-                video_height
-            )
+        for i, ((img_width, img_height), resized_path) in enumerate(prepared):
+            if resized_path:
+                # Already at its exact size with alpha - the input feeds
+                # overlay directly (it converts RGBA itself), no scale needed
+                image_input = f"[{i + 1}:v]"
+            else:
+                image_input = ""
+                # Scale and add alpha channel for transparency support
+                # format=yuva420p adds alpha channel. The chain feeds straight
+                # into overlay's second input, so no [imgN] label is needed
+                parts.append(
+                    f"[{i + 1}:v]"
+                    f"scale={img_width}:{img_height}:force_original_aspect_ratio=decrease,"
+                    f"format=yuva420p,"
+                )
             
             start_time = start_times[i]
             end_time = end_times[i]
@@ -402,9 +638,7 @@ class ImageOverlayProcessor:
             # Choose animation style for this image
             current_animation = animation_style
             if animation_style == 'random':
-                current_animation = random.choice([
-                    'slide_bottom', 'slide_left', 'slide_right', 'slide_top', 'fade'
-                ])
+                current_animation = random.choice(RANDOM_ANIMATIONS)
             
             # Animation timing
             anim_duration = min(animation_duration, actual_duration * 0.25)  # Max 25% of duration
@@ -425,30 +659,22 @@ class ImageOverlayProcessor:
                 exit_start_time=exit_start_time
             )
             
-            # Enable expression - show image only during its time window
-            enable_expr = f"between(t,{start_time},{end_time})"
+            # Create overlay, shown only during its time window (enable).
+            # The labelled layer binds overlay's first (main) input; the
+            # image is the second, either labelled or from the chain. The image
+            # input only lives for its window, so pass the main video
+            # through once it ends instead of repeating its last frame
+            parts.extend((
+                current_layer, image_input, "overlay=x='", x_expr, "':y='", y_expr,
+                f"':eof_action=pass:enable='between(t,{start_time},{end_time})'"
+            ))
             
-            # Create overlay
-            if i == len(image_paths) - 1:
-                # Last overlay - output to final
-                overlay_cmd = (
-                    f"{current_layer}[img{i}]overlay="
-                    f"x='{x_expr}':y='{y_expr}':enable='{enable_expr}'"
-                )
-            else:
-                # Intermediate overlay
-                overlay_cmd = (
-                    f"{current_layer}[img{i}]overlay="
-                    f"x='{x_expr}':y='{y_expr}':enable='{enable_expr}'[tmp{i}]"
-                )
+            if i < len(image_paths) - 1:
+                # Intermediate overlay - label it for the next one
                 current_layer = f"[tmp{i}]"
-            
-            filters.append(overlay_cmd)
-        
-        # Join all filters with semicolons
-        filter_complex = ";".join(filters)
+                parts.extend((current_layer, ";"))
         
-        return filter_complex
+        return "".join(parts), input_paths
     
     def _build_animation_expressions(
         self,
@@ -471,60 +697,46 @@ class ImageOverlayProcessor:
             Tuple of (x_expr, y_expr)
         """
         
+        timing = {
+            'start': start_time,
+            'exit_start': exit_start_time,
+            'anim': max(anim_duration, 0.001),  # Ramps divide by this
+        }
+        
         if animation_type == 'slide_bottom':
             # Enter from bottom, exit to bottom
-            off_screen_y = video_height + 100  # Start below screen
-            
             x_expr = str(center_x)
-            y_expr = (
-                f"if(lt(t,{start_time}),{off_screen_y},"  # Before start: off-screen
-                f"if(lt(t,{start_time + anim_duration}),"  # Entry animation
-                f"{off_screen_y}-(({off_screen_y}-{center_y})*(t-{start_time})/{anim_duration}),"
-                f"if(lt(t,{exit_start_time}),{center_y},"  # Static at center
-                f"{center_y}+(({off_screen_y}-{center_y})*(t-{exit_start_time})/{anim_duration})"  # Exit animation
-                f")))"
+            y_expr = SLIDE_EXPR.format(
+                off=video_height + 100,  # Start below screen
+                center=center_y,
+                **timing
             )
         
         elif animation_type == 'slide_top':
             # Enter from top, exit to top
-            off_screen_y = -img_height - 100  # Start above screen
-            
             x_expr = str(center_x)
-            y_expr = (
-                f"if(lt(t,{start_time}),{off_screen_y},"
-                f"if(lt(t,{start_time + anim_duration}),"
-                f"{off_screen_y}+(({center_y}-{off_screen_y})*(t-{start_time})/{anim_duration}),"
-                f"if(lt(t,{exit_start_time}),{center_y},"
-                f"{center_y}-(({center_y}-{off_screen_y})*(t-{exit_start_time})/{anim_duration})"
-                f")))"
+            y_expr = SLIDE_EXPR.format(
+                off=-img_height - 100,  # Start above screen
+                center=center_y,
+                **timing
             )
         
         elif animation_type == 'slide_left':
             # Enter from left, exit to left
-            off_screen_x = -img_width - 100  # Start left of screen
-            
             y_expr = str(center_y)
-            x_expr = (
-                f"if(lt(t,{start_time}),{off_screen_x},"
-                f"if(lt(t,{start_time + anim_duration}),"
-                f"{off_screen_x}+(({center_x}-{off_screen_x})*(t-{start_time})/{anim_duration}),"
-                f"if(lt(t,{exit_start_time}),{center_x},"
-                f"{center_x}-(({center_x}-{off_screen_x})*(t-{exit_start_time})/{anim_duration})"
-                f")))"
+            x_expr = SLIDE_EXPR.format(
+                off=-img_width - 100,  # Start left of screen
+                center=center_x,
+                **timing
             )
         
         elif animation_type == 'slide_right':
             # Enter from right, exit to right
-            off_screen_x = video_width + 100  # Start right of screen
-            
             y_expr = str(center_y)
-            x_expr = (
-                f"if(lt(t,{start_time}),{off_screen_x},"
-                f"if(lt(t,{start_time + anim_duration}),"
-                f"{off_screen_x}-(({off_screen_x}-{center_x})*(t-{start_time})/{anim_duration}),"
-                f"if(lt(t,{exit_start_time}),{center_x},"
-                f"{center_x}+(({off_screen_x}-{center_x})*(t-{exit_start_time})/{anim_duration})"
-                f")))"
+            x_expr = SLIDE_EXPR.format(
+                off=video_width + 100,  # Start right of screen
+                center=center_x,
+                **timing
             )
         
         else:  # 'fade' - no position animation, just static centered position
@@ -539,7 +751,10 @@ class ImageOverlayProcessor:
         video_path: str,
         image_paths: List[str],
         filter_complex: str,
-        output_path: str
+        output_path: str,
+        timing_info: Optional[Dict] = None,
+        threads: Optional[int] = None,
+        is_final: bool = True
     ) -> bool:
         """
         Execute FFmpeg command to create overlay video
@@ -549,54 +764,76 @@ class ImageOverlayProcessor:
             image_paths: List of image paths
             filter_complex: Filter complex string
             output_path: Output video path
+            timing_info: Timing information dict (limits each image input
+                         to its display window when given)
+            threads: FFmpeg encoder threads (uses config.FFMPEG_THREADS if None)
+            is_final: Add faststart (rewrites the file once after encoding)
             
         Returns:
             True if successful, False otherwise
         """
+        script_path = None
+        
         try:
-            # Build FFmpeg command
-            cmd = ['ffmpeg']
+            # Build FFmpeg command (no banner or progress stats - stderr is
+            # only read when the run fails)
+            cmd = ['ffmpeg', '-hide_banner', '-nostats']
             
             # Add video input
             cmd.extend(['-i', video_path])
             
-            # Add all image inputs with loop
-            for img_path in image_paths:
-                cmd.extend(['-loop', '1', '-i', img_path])
+            # Add all image inputs with loop. With timing, each image starts
+            # at its start time (-itsoffset) and stops after its display
+            # duration (-t), so no frames are decoded while it is off-screen
+            for i, img_path in enumerate(image_paths):
+                cmd.extend(['-loop', '1'])
+                if timing_info:
+                    start_time = timing_info['start_times'][i]
+                    end_time = timing_info['end_times'][i]
+                    cmd.extend([
+                        '-t', f"{end_time - start_time:.3f}",
+                        '-itsoffset', f"{start_time:.3f}",
+                    ])
+                cmd.extend(['-i', img_path])
             
-            # Add filter complex
-            cmd.extend(['-filter_complex', filter_complex])
+            # Add filter complex (from a file when it's too long for argv)
+            if len(filter_complex) > FILTER_SCRIPT_THRESHOLD:
+                with tempfile.NamedTemporaryFile(
+                    'w', suffix='.txt', delete=False, dir=str(self.temp_dir)
+                ) as f:
+                    f.write(filter_complex)
+                    script_path = f.name
+                cmd.extend(['-filter_complex_script', script_path])
+            else:
+                cmd.extend(['-filter_complex', filter_complex])
             
             # Output settings
             cmd.extend([
-                '-c:v', config.VIDEO_CODEC,
-                '-preset', config.VIDEO_PRESET,
-                '-crf', str(config.VIDEO_CRF),
+                *get_video_encoder_args(),  # NVENC/QSV/VideoToolbox when available
                 '-c:a', 'copy',  # Copy audio stream
-                '-movflags', 'faststart',
-                '-threads', str(config.FFMPEG_THREADS),
+                '-threads', str(threads or config.FFMPEG_THREADS),
                 '-shortest',  # Stop when shortest input ends (the video)
-                '-y',  # Overwrite output
-                output_path
             ])
             
+            # faststart costs a second pass over the whole file - only
+            # worth it for files that will be streamed/played
+            if is_final:
+                cmd.extend(['-movflags', 'faststart'])
+            
+            cmd.extend(['-y', output_path])  # Overwrite output
+            
             if config.VERBOSE or config.DEBUG:
                 print(f"\n=== FFMPEG COMMAND ===")
                 print(' '.join(cmd))
                 print(f"======================\n")
             
-            # Execute
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True
-            )
+            # Execute (stderr is streamed; only its tail is kept)
+            returncode, stderr_tail = run_ffmpeg(cmd)
             
-            if result.returncode != 0:
+            if returncode != 0:
                 if config.DEBUG:
-                    print(f"FFmpeg error (return code {result.returncode}):")
-                    print(f"STDERR: {result.stderr}")
-                    print(f"STDOUT: {result.stdout}")
+                    print(f"FFmpeg error (return code {returncode}):")
+                    print(f"STDERR: {stderr_tail}")
                 return False
             
             if config.VERBOSE:
@@ -610,6 +847,10 @@ class ImageOverlayProcessor:
                 import traceback
                 traceback.print_exc()
             return False
+        
+        finally:
+            if script_path and os.path.exists(script_path):
+                os.unlink(script_path)
     
     def preview_timing(
         self,
@@ -669,13 +910,27 @@ class ImageOverlayProcessor:
 # MODULE-LEVEL CONVENIENCE FUNCTIONS
 # ============================================================================
 
+# Shared instance for the module-level functions (constructing one creates
+# temp_dir and a FileManager)
+_DEFAULT_PROCESSOR: Optional[ImageOverlayProcessor] = None
+
+
+def _processor() -> ImageOverlayProcessor:
+    """Get the shared ImageOverlayProcessor, creating it on first use"""
+    global _DEFAULT_PROCESSOR
+    if _DEFAULT_PROCESSOR is None:
+        _DEFAULT_PROCESSOR = ImageOverlayProcessor()
+    return _DEFAULT_PROCESSOR
+
+
 def overlay_images_on_video(
     video_path: str,
     images_folder: str,
     output_path: str,
     duration_per_image: Optional[float] = None,
     delay_between_images: float = 0.0,
-    animation_style: str = 'random'
+    animation_style: str = 'random',
+    is_final: bool = True
 ) -> Optional[str]:
     """
     Main function to overlay images on video with animations
@@ -687,21 +942,41 @@ def overlay_images_on_video(
         duration_per_image: Duration each image shows (auto if None)
         delay_between_images: Gap between images in seconds
         animation_style: Animation type
+        is_final: False for intermediate outputs (skips the faststart rewrite)
         
     Returns:
         Path to output video or None if failed
     """
-    processor = ImageOverlayProcessor()
+    processor = _processor()
     return processor.process(
         video_path=video_path,
         images_folder=images_folder,
         output_path=output_path,
         duration_per_image=duration_per_image,
         delay_between_images=delay_between_images,
-        animation_style=animation_style
+        animation_style=animation_style,
+        is_final=is_final
     )
 
 
+def overlay_images_on_videos(
+    jobs: List[Dict],
+    max_workers: Optional[int] = None
+) -> List[Optional[str]]:
+    """
+    Overlay images on multiple videos concurrently
+    
+    Args:
+        jobs: List of dicts with overlay_images_on_video() arguments
+        max_workers: Concurrent FFmpeg processes (defaults to half the CPU count)
+        
+    Returns:
+        List of output paths (None for failed jobs), in job order
+    """
+    processor = _processor()
+    return processor.process_batch(jobs, max_workers=max_workers)
+
+
 def preview_image_timing(
     num_images: int,
     video_duration: float,
@@ -711,7 +986,7 @@ def preview_image_timing(
     """
     Preview timing configuration for images
     """
-    processor = ImageOverlayProcessor()
+    processor = _processor()
     return processor.preview_timing(
         num_images=num_images,
         video_duration=video_duration,
@@ -724,7 +999,7 @@ def get_images_from_folder(folder_path: str) -> List[str]:
     """
     Get list of images from folder
     """
-    processor = ImageOverlayProcessor()
+    processor = _processor()
     return processor._load_images_from_folder(folder_path)
 
 
@@ -737,21 +1012,28 @@ def validate_overlay_inputs(
     Validate inputs for image overlay
     """
     # Check video
-    if not os.path.exists(video_path):
+    try:
+        video_stat = os.stat(video_path)
+    except OSError:
         return False, "Video file not found"
     
+    if not stat.S_ISREG(video_stat.st_mode):
+        return False, "Invalid video file"
+    
     video_info = get_video_info(video_path)
     if not video_info:
         return False, "Invalid video file"
     
     # Check images folder
-    if not os.path.exists(images_folder):
+    try:
+        folder_stat = os.stat(images_folder)
+    except OSError:
         return False, "Images folder not found"
     
-    if not os.path.isdir(images_folder):
+    if not stat.S_ISDIR(folder_stat.st_mode):
         return False, "Images path is not a folder"
     
-    processor = ImageOverlayProcessor()
+    processor = _processor()
     images = processor._load_images_from_folder(images_folder)
     
     if not images:
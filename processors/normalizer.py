@@ -4,13 +4,122 @@ Handles fps, codec, resolution, bitrate normalization and cropping
 """
 
 import os
-import subprocess
+import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Optional, Tuple, List
-import ffmpeg
+
+try:
+    import av
+except ImportError:
+    av = None
 
 import config
+from utils.ffmpeg_helper import (
+    detect_hw_encoder, get_video_encoder_args, get_x264_tuning_args,
+    probe_file, run_ffmpeg,
+)
+
+
+# Source audio in these codecs is stream-copied into these containers
+# instead of being re-encoded (normalization only touches video)
+AUDIO_COPY_CODECS = frozenset({'aac'})
+AUDIO_COPY_CONTAINERS = frozenset({'.mp4', '.m4v', '.mov', '.mkv'})
+
+
+def _scale_bitrate(bitrate: str, factor: float) -> str:
+    """Scale an FFmpeg bitrate string ('5M', '800k', '2500000') by factor"""
+    if bitrate[-1:].isalpha():
+        return f"{float(bitrate[:-1]) * factor:g}{bitrate[-1]}"
+    return str(int(float(bitrate) * factor))
+
+
+@lru_cache(maxsize=1024)
+def _av_video_info(file_path: str, mtime_ns: int, size: int) -> Optional[Dict]:
+    """
+    Video info read in-process with PyAV (shared - treat as read-only)
+    
+    Same fields as the ffprobe path in VideoNormalizer._get_video_info,
+    without starting ffprobe. mtime_ns and size are part of the key so a
+    rewritten file is re-read.
+    """
+    with av.open(file_path, metadata_errors='ignore') as container:
+        if not container.streams.video:
+            return None
+        
+        video_stream = container.streams.video[0]
+        audio_stream = container.streams.audio[0] if container.streams.audio else None
+        
+        width = video_stream.codec_context.width
+        height = video_stream.codec_context.height
+        
+        # base_rate is ffprobe's r_frame_rate
+        rate = video_stream.base_rate or video_stream.average_rate
+        fps = float(rate) if rate else 30
+        
+        duration = container.duration / av.time_base if container.duration else 0.0
+        
+        return {
+            'width': width,
+            'height': height,
+            'fps': fps,
+            'duration': duration,
+            'codec': video_stream.codec_context.name,
+            'pix_fmt': video_stream.codec_context.pix_fmt,
+            'bitrate': str(container.bit_rate or 0),
+            'audio_codec': audio_stream.codec_context.name if audio_stream else None,
+            'aspect_ratio': width / height if height > 0 else 16/9,
+        }
+
+
+@lru_cache(maxsize=128)
+def _filter_chain(
+    target_width: int,
+    target_height: int,
+    target_fps: int,
+    crop_mode: str
+) -> str:
+    """Normalization filter chain for a target (see _build_filter_chain)"""
+    filters = []
+    
+    target_aspect = target_width / target_height
+    
+    # Handle resolution and aspect ratio
+    if crop_mode == 'center':
+        # Crop to target aspect ratio, then scale
+        # Wider input crops width, taller input crops height; crop
+        # centres the window by default
+        filters.append(
+            f"crop="
+            f"w='min(iw,ih*{target_aspect})':"
+            f"h='min(ih,iw/{target_aspect})'"
+        )
+        
+        # Add scale filter
+        filters.append(f"scale={target_width}:{target_height}")
+    
+    elif crop_mode == 'fit':
+        # Scale to fit within target resolution (may have black bars)
+        filters.append(
+            f"scale={target_width}:{target_height}:force_original_aspect_ratio=decrease,"
+            f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2"
+        )
+    
+    elif crop_mode == 'stretch':
+        # Just scale (ignore aspect ratio)
+        filters.append(f"scale={target_width}:{target_height}")
+    
+    # Resample to the target fps (passes frames through unchanged when
+    # the input already matches)
+    filters.append(f"fps={target_fps}")
+    
+    # Optional: Add quality enhancement filters
+    # Denoise slightly
+    # filters.append("hqdn3d=1.5:1.5:6:6")
+    
+    return ','.join(filters)
 
 
 class VideoNormalizer:
@@ -29,11 +138,16 @@ class VideoNormalizer:
         target_codec: str = 'libx264',
         target_bitrate: str = '5M',
         crop_mode: str = 'center',
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        threads: Optional[int] = None,
+        force: bool = False
     ) -> Optional[str]:
         """
         Normalize video to target specifications
         
+        Clips that already match the target resolution, fps and codec are
+        remuxed (stream copy) instead of re-encoded, unless force is set.
+        
         Args:
             video_path: Input video path
             target_resolution: Target (width, height)
@@ -42,6 +156,8 @@ class VideoNormalizer:
             target_bitrate: Target video bitrate
             crop_mode: How to handle aspect ratio ('center', 'fit', 'stretch')
             output_path: Custom output path (optional)
+            threads: FFmpeg threads (uses config.FFMPEG_THREADS if None)
+            force: Always re-encode, even if the clip already matches
             
         Returns:
             Path to normalized video or None if failed
@@ -52,31 +168,44 @@ class VideoNormalizer:
                     print(f"Video file not found: {video_path}")
                 return None
             
-            # Get input video info
-            video_info = self._get_video_info(video_path)
-            if not video_info:
-                return None
-            
             # Determine output path
             if output_path is None:
                 input_name = Path(video_path).stem
                 output_path = str(self.temp_dir / f"{input_name}_normalized.mp4")
             
-            # Build FFmpeg filter chain
+            # Fast path: already in target format - copy the streams
+            if (
+                not force
+                and target_codec == 'libx264'
+                and os.path.abspath(output_path) != os.path.abspath(video_path)
+                and self._can_remux(video_path, target_resolution, target_fps)
+            ):
+                if self._remux(video_path, output_path) and os.path.exists(output_path):
+                    return output_path
+                
+                if config.DEBUG:
+                    print("Remux failed, re-encoding")
+            
+            # Build FFmpeg filter chain (geometry is resolved by FFmpeg from
+            # the input size, so the video stream needs no probing)
             filter_chain = self._build_filter_chain(
-                video_info,
                 target_resolution,
                 target_fps,
                 crop_mode
             )
             
+            # Source audio codec decides between copying and re-encoding
+            audio_codec = self._get_audio_codec(video_path)
+            
             # Build FFmpeg command
             success = self._run_ffmpeg_normalize(
                 video_path,
                 output_path,
                 filter_chain,
                 target_codec,
-                target_bitrate
+                target_bitrate,
+                threads,
+                audio_codec
             )
             
             if success and os.path.exists(output_path):
@@ -89,9 +218,23 @@ class VideoNormalizer:
                 print(f"Error normalizing video: {str(e)}")
             return None
     
+    def _get_audio_codec(self, video_path: str) -> Optional[str]:
+        """
+        Get the codec of the first audio stream
+        
+        Args:
+            video_path: Path to video file
+            
+        Returns:
+            Codec name (e.g. 'aac') or None if there is no audio / on error
+        """
+        # Same cached info needs_normalization reads
+        info = self._get_video_info(video_path)
+        return info['audio_codec'] if info else None
+    
     def _get_video_info(self, video_path: str) -> Optional[Dict]:
         """
-        Get video information using ffprobe
+        Get video information using PyAV, or ffprobe if it isn't installed
         
         Args:
             video_path: Path to video file
@@ -99,8 +242,19 @@ class VideoNormalizer:
         Returns:
             Dict with video info or None
         """
+        if av is not None:
+            try:
+                st = os.stat(video_path)
+                return _av_video_info(video_path, st.st_mtime_ns, st.st_size)
+            except Exception as e:
+                if config.DEBUG:
+                    print(f"PyAV could not read {video_path}, using ffprobe: {str(e)}")
+        
         try:
-            probe = ffmpeg.probe(video_path)
+            # Shared probe cache (keyed by path, mtime and size)
+            probe = probe_file(video_path)
+            if not probe:
+                return None
             
             # Find video stream
             video_stream = next(
@@ -111,6 +265,11 @@ class VideoNormalizer:
             if not video_stream:
                 return None
             
+            audio_stream = next(
+                (stream for stream in probe['streams'] if stream['codec_type'] == 'audio'),
+                None
+            )
+            
             # Extract info
             width = int(video_stream['width'])
             height = int(video_stream['height'])
@@ -135,7 +294,9 @@ class VideoNormalizer:
                 'fps': fps,
                 'duration': duration,
                 'codec': codec,
+                'pix_fmt': video_stream.get('pix_fmt'),
                 'bitrate': bitrate,
+                'audio_codec': audio_stream.get('codec_name') if audio_stream else None,
                 'aspect_ratio': width / height if height > 0 else 16/9,
             }
         
@@ -146,7 +307,6 @@ class VideoNormalizer:
     
     def _build_filter_chain(
         self,
-        video_info: Dict,
         target_resolution: Tuple[int, int],
         target_fps: int,
         crop_mode: str
@@ -154,8 +314,10 @@ class VideoNormalizer:
         """
         Build FFmpeg filter chain for normalization
         
+        Crop geometry is written as expressions of the input size (iw/ih),
+        so the chain works for any input without probing it first
+        
         Args:
-            video_info: Input video information
             target_resolution: Target (width, height)
             target_fps: Target fps
             crop_mode: Cropping mode
@@ -163,57 +325,8 @@ class VideoNormalizer:
         Returns:
             FFmpeg filter string
         """
-        filters = []
-        
-        target_width, target_height = target_resolution
-        input_width = video_info['width']
-        input_height = video_info['height']
-        
-        target_aspect = target_width / target_height
-        input_aspect = input_width / input_height
-        
-        # Handle resolution and aspect ratio
-        if crop_mode == 'center':
-            # Crop to target aspect ratio, then scale
-            if input_aspect > target_aspect:
-                # Input is wider - crop width
-                crop_width = int(input_height * target_aspect)
-                crop_height = input_height
-                crop_x = (input_width - crop_width) // 2
-                crop_y = 0
-            else:
-                # Input is taller - crop height
-                crop_width = input_width
-                crop_height = int(input_width / target_aspect)
-                crop_x = 0
-                crop_y = (input_height - crop_height) // 2
-            
-            # Add crop filter
-            filters.append(f"crop={crop_width}:{crop_height}:{crop_x}:{crop_y}")
-            
-            # Add scale filter
-            filters.append(f"scale={target_width}:{target_height}")
-        
-        elif crop_mode == 'fit':
-            # Scale to fit within target resolution (may have black bars)
-            filters.append(
-                f"scale={target_width}:{target_height}:force_original_aspect_ratio=decrease,"
-                f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2"
-            )
-        
-        elif crop_mode == 'stretch':
-            # Just scale (ignore aspect ratio)
-            filters.append(f"scale={target_width}:{target_height}")
-        
-        # Add fps filter if needed
-        if abs(video_info['fps'] - target_fps) > 0.1:
-            filters.append(f"fps={target_fps}")
-        
-        # Optional: Add quality enhancement filters
-        # Denoise slightly
-        # filters.append("hqdn3d=1.5:1.5:6:6")
-        
-        return ','.join(filters)
+        # The chain depends only on the target, so it's built once per target
+        return _filter_chain(*target_resolution, target_fps, crop_mode)
     
     def _run_ffmpeg_normalize(
         self,
@@ -221,7 +334,9 @@ class VideoNormalizer:
         output_path: str,
         filter_chain: str,
         codec: str,
-        bitrate: str
+        bitrate: str,
+        threads: Optional[int] = None,
+        audio_codec: Optional[str] = None
     ) -> bool:
         """
         Run FFmpeg normalization command
@@ -232,71 +347,151 @@ class VideoNormalizer:
             filter_chain: FFmpeg filter string
             codec: Video codec
             bitrate: Video bitrate
+            threads: FFmpeg threads (uses config.FFMPEG_THREADS if None)
+            audio_codec: Source audio codec (copied when the output
+                         container takes it as-is, else re-encoded)
             
         Returns:
             True if successful, False otherwise
         """
+        threads = threads or config.FFMPEG_THREADS
+        
         try:
-            # Build FFmpeg command using ffmpeg-python
-            stream = ffmpeg.input(input_path)
-            
-            # Apply video filters
-            stream = ffmpeg.filter(stream, 'scale', filter_chain) if not filter_chain else stream
-            
-            # If we have a complex filter chain, use it directly
-            if filter_chain:
-                stream = stream.filter('null')  # Placeholder, we'll use -vf directly
-            
-            # Output with settings
-            stream = ffmpeg.output(
-                stream,
-                output_path,
-                vcodec=codec,
-                video_bitrate=bitrate,
-                acodec=config.AUDIO_CODEC,
-                audio_bitrate=config.AUDIO_BITRATE,
-                preset=config.VIDEO_PRESET,
-                crf=config.VIDEO_CRF,
-                movflags='faststart',
-                **{'threads': config.FFMPEG_THREADS}
-            )
-            
-            # Run with filter chain if provided
-            if filter_chain:
-                # Use subprocess for complex filters
-                cmd = [
-                    'ffmpeg',
-                    '-i', input_path,
-                    '-vf', filter_chain,
+            if codec == config.VIDEO_CODEC and detect_hw_encoder():
+                # Hardware encoder - brings its own rate control
+                video_args = get_video_encoder_args()
+            elif config.RATE_CONTROL == 'vbr':
+                # Average bitrate with a peak cap (no CRF - one target only)
+                video_args = [
                     '-c:v', codec,
+                    '-preset', config.VIDEO_PRESET,
                     '-b:v', bitrate,
-                    '-c:a', config.AUDIO_CODEC,
-                    '-b:a', config.AUDIO_BITRATE,
+                    '-maxrate', _scale_bitrate(bitrate, 1.5),
+                    '-bufsize', _scale_bitrate(bitrate, 2),
+                    *get_x264_tuning_args(codec),
+                ]
+            else:
+                # Constant quality - x264 ignores -b:v once -crf is set
+                video_args = [
+                    '-c:v', codec,
                     '-preset', config.VIDEO_PRESET,
                     '-crf', str(config.VIDEO_CRF),
-                    '-movflags', 'faststart',
-                    '-threads', str(config.FFMPEG_THREADS),
-                    '-y',  # Overwrite output
-                    output_path
+                    *get_x264_tuning_args(codec),
                 ]
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True
-                )
-                
-                return result.returncode == 0
+            
+            if (
+                audio_codec in AUDIO_COPY_CODECS
+                and Path(output_path).suffix.lower() in AUDIO_COPY_CONTAINERS
+            ):
+                audio_args = ['-c:a', 'copy']
             else:
-                # Use ffmpeg-python
-                ffmpeg.run(stream, overwrite_output=True, quiet=not config.VERBOSE)
-                return True
+                audio_args = ['-c:a', config.AUDIO_CODEC, '-b:a', config.AUDIO_BITRATE]
+            
+            # Build FFmpeg command (no banner, progress stats or keyboard
+            # polling on stdin)
+            cmd = ['ffmpeg', '-hide_banner', '-nostats', '-nostdin', '-i', input_path]
+            
+            if filter_chain:
+                cmd.extend(['-vf', filter_chain])
+            
+            cmd.extend([
+                *video_args,
+                *audio_args,
+                '-movflags', 'faststart',
+                '-threads', str(threads),
+                '-y',  # Overwrite output
+                output_path
+            ])
+            
+            # Execute (stderr is streamed; only its tail is kept)
+            returncode, stderr_tail = run_ffmpeg(cmd)
+            
+            if returncode != 0:
+                if config.DEBUG:
+                    print(f"FFmpeg error (return code {returncode}):")
+                    print(f"STDERR: {stderr_tail}")
+                return False
+            
+            return True
         
         except Exception as e:
             if config.DEBUG:
                 print(f"FFmpeg error: {str(e)}")
             return False
     
+    def _can_remux(
+        self,
+        video_path: str,
+        target_resolution: Tuple[int, int],
+        target_fps: int
+    ) -> bool:
+        """
+        Check if a stream copy gives the same result as the encode path
+        
+        Stricter than needs_normalization: the copy has to match what
+        re-encoding would produce (exact fps, 8-bit 4:2:0, AAC or no
+        audio), or the combiner can't join it with encoded clips by copy.
+        
+        Args:
+            video_path: Path to video
+            target_resolution: Target resolution
+            target_fps: Target fps
+            
+        Returns:
+            True if the clip can be remuxed instead of re-encoded
+        """
+        info = self._get_video_info(video_path)
+        
+        if not info:
+            return False
+        
+        return (
+            info['width'] == target_resolution[0]
+            and info['height'] == target_resolution[1]
+            and abs(info['fps'] - target_fps) < 1e-3
+            and info['codec'] == 'h264'
+            and info.get('pix_fmt') == 'yuv420p'
+            and info['audio_codec'] in ('aac', None)
+        )
+    
+    def _remux(self, input_path: str, output_path: str) -> bool:
+        """
+        Copy the first video and audio stream into a new file without
+        re-encoding
+        
+        Args:
+            input_path: Input video path
+            output_path: Output video path
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        cmd = [
+            'ffmpeg', '-hide_banner', '-nostats', '-nostdin',
+            '-i', input_path,
+            # Same streams the encode path keeps - no data/subtitle tracks
+            '-map', '0:v:0', '-map', '0:a:0?',
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            '-y',  # Overwrite output
+            output_path
+        ]
+        
+        try:
+            returncode, stderr_tail = run_ffmpeg(cmd)
+        except OSError as e:
+            if config.DEBUG:
+                print(f"FFmpeg error: {str(e)}")
+            return False
+        
+        if returncode != 0:
+            if config.DEBUG:
+                print(f"FFmpeg remux error (return code {returncode}):")
+                print(f"STDERR: {stderr_tail}")
+            return False
+        
+        return True
+    
     def get_video_stats(self, video_path: str) -> Optional[Dict]:
         """
         Get detailed video statistics
@@ -346,12 +541,26 @@ class VideoNormalizer:
         return False
 
 
+# Shared instance for the module-level functions (constructing one creates
+# the output directory)
+_DEFAULT_NORMALIZER: Optional[VideoNormalizer] = None
+
+
+def _normalizer() -> VideoNormalizer:
+    """Get the shared VideoNormalizer, creating it on first use"""
+    global _DEFAULT_NORMALIZER
+    if _DEFAULT_NORMALIZER is None:
+        _DEFAULT_NORMALIZER = VideoNormalizer()
+    return _DEFAULT_NORMALIZER
+
+
 def normalize_video(
     video_path: str,
     target_resolution: Tuple[int, int] = None,
     target_fps: int = None,
     crop_mode: str = 'center',
-    output_path: Optional[str] = None
+    output_path: Optional[str] = None,
+    force: bool = False
 ) -> Optional[str]:
     """
     Main function to normalize a video
@@ -362,6 +571,7 @@ def normalize_video(
         target_fps: Target fps - defaults to 30
         crop_mode: How to handle aspect ratio ('center', 'fit', 'stretch')
         output_path: Custom output path
+        force: Re-encode even if the clip already matches the target
         
     Returns:
         Path to normalized video or None if failed
@@ -372,7 +582,7 @@ def normalize_video(
     if target_fps is None:
         target_fps = config.TARGET_FPS
     
-    normalizer = VideoNormalizer()
+    normalizer = _normalizer()
     
     return normalizer.normalize(
         video_path=video_path,
@@ -381,27 +591,59 @@ def normalize_video(
         target_codec=config.VIDEO_CODEC,
         target_bitrate=config.TARGET_BITRATE,
         crop_mode=crop_mode,
-        output_path=output_path
+        output_path=output_path,
+        force=force
     )
 
 
+def _existing_files(paths: List[str]) -> set:
+    """
+    Subset of paths that are existing regular files, using one
+    os.scandir per parent directory
+    """
+    by_dir: Dict[str, List[str]] = {}
+    for path in paths:
+        by_dir.setdefault(os.path.dirname(path) or '.', []).append(path)
+    
+    existing = set()
+    for directory, dir_paths in by_dir.items():
+        try:
+            with os.scandir(directory) as entries:
+                files = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            continue
+        
+        existing.update(
+            path for path in dir_paths if os.path.basename(path) in files
+        )
+    
+    return existing
+
+
 def batch_normalize(
     video_paths: List[str],
     target_resolution: Tuple[int, int] = None,
     target_fps: int = None,
-    crop_mode: str = 'center'
+    crop_mode: str = 'center',
+    max_workers: Optional[int] = None,
+    force: bool = False
 ) -> List[str]:
     """
-    Normalize multiple videos
+    Normalize multiple videos, running several FFmpeg encodes at once
+    
+    Each FFmpeg gets an equal share of config.FFMPEG_THREADS so the
+    total thread count stays close to the core count.
     
     Args:
         video_paths: List of video paths
         target_resolution: Target resolution
         target_fps: Target fps
         crop_mode: Cropping mode
+        max_workers: Concurrent FFmpeg processes (defaults to half the CPU count)
+        force: Re-encode even clips that already match the target
         
     Returns:
-        List of normalized video paths
+        List of normalized video paths (input order, failures skipped)
     """
     if target_resolution is None:
         target_resolution = config.RESOLUTIONS['reels']
@@ -409,36 +651,50 @@ def batch_normalize(
     if target_fps is None:
         target_fps = config.TARGET_FPS
     
-    normalizer = VideoNormalizer()
-    normalized_videos = []
+    # Drop missing files up front - one directory scan per folder instead
+    # of a stat per file
+    existing = _existing_files(video_paths)
+    video_paths = [path for path in video_paths if path in existing]
+    
+    if not video_paths:
+        return []
+    
+    normalizer = _normalizer()
+    
+    # Warm the info cache in parallel (probes are short and IO bound), so
+    # the encode workers don't wait on them one at a time
+    with ThreadPoolExecutor(max_workers=min(8, len(video_paths))) as executor:
+        list(executor.map(normalizer._get_video_info, video_paths))
+    
+    if max_workers is None:
+        max_workers = (os.cpu_count() or 2) // 2
+    max_workers = max(1, min(max_workers, len(video_paths)))
+    threads = max(1, config.FFMPEG_THREADS // max_workers)
     
-    for video_path in video_paths:
-        normalized = normalizer.normalize(
+    def normalize_one(video_path: str) -> Optional[str]:
+        return normalizer.normalize(
             video_path=video_path,
             target_resolution=target_resolution,
             target_fps=target_fps,
-            crop_mode=crop_mode
+            crop_mode=crop_mode,
+            threads=threads,
+            force=force
         )
-        
-        if normalized:
-            normalized_videos.append(normalized)
     
-    return normalized_videos
+    # Threads are enough here: each worker just waits on its ffmpeg
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(normalize_one, video_paths))
+    
+    return [normalized for normalized in results if normalized]
 
 
+@lru_cache(maxsize=1)
 def check_ffmpeg_installed() -> bool:
     """
-    Check if FFmpeg is installed
+    Check if FFmpeg is installed (checked once per process)
     
     Returns:
         True if installed, False otherwise
     """
-    try:
-        subprocess.run(
-            ['ffmpeg', '-version'],
-            capture_output=True,
-            check=True
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
\ No newline at end of file
+    # A PATH lookup - no need to start ffmpeg just to see that it exists
+    return shutil.which('ffmpeg') is not None
\ No newline at end of file
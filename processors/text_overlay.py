@@ -3,13 +3,83 @@ Text Overlay Processor - Add text with background box to video
 Uses FFmpeg drawbox and drawtext filters to overlay text with colored background
 """
 
+import hashlib
 import os
-import subprocess
+import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple, Dict, List
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Pillow is optional - falls back to drawbox/drawtext
+    Image = ImageDraw = ImageFont = None
 
 import config
-from utils.ffmpeg_helper import get_video_info, get_video_resolution
+from utils.ffmpeg_helper import (
+    detect_hw_encoder, get_h264_parameter_sets, get_keyframe_times, get_video_info,
+    get_video_resolution, get_video_encoder_args, has_filter, run_ffmpeg,
+)
+from utils.mp4_probe import h264_pps_uses_cabac
+
+
+# Average glyph width as a fraction of font size, used when the font
+# can't be measured
+CHAR_WIDTH_RATIO = 0.6
+
+
+# H.264 profile_idc -> libx264 -profile:v, for smart-cut middle parts
+X264_PROFILES = {66: 'baseline', 77: 'main', 100: 'high'}
+
+
+# Common system font files, tried in order when no font is configured.
+# Passing drawtext a fontfile skips fontconfig's font lookup (and its
+# cache scan of the system font directories on a cold start)
+DEFAULT_FONT_CANDIDATES = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',       # Debian/Ubuntu
+    '/usr/share/fonts/dejavu-sans-fonts/DejaVuSans.ttf',     # Fedora
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',                   # Arch
+    '/Library/Fonts/Arial.ttf',                              # macOS
+    '/System/Library/Fonts/Supplemental/Arial.ttf',          # macOS 10.15+
+    'C:/Windows/Fonts/arial.ttf',                            # Windows
+)
+
+
+@lru_cache(maxsize=1)
+def _font_path() -> Optional[str]:
+    """Font file for the overlay: config.TEXT_OVERLAY_FONT_PATH or a system default"""
+    if config.TEXT_OVERLAY_FONT_PATH:
+        return str(config.TEXT_OVERLAY_FONT_PATH)
+    
+    return next((path for path in DEFAULT_FONT_CANDIDATES if os.path.isfile(path)), None)
+
+
+@lru_cache(maxsize=64)
+def _load_font(font_path: str, font_size: int):
+    """Load a TrueType font at a size (cached - parsing the file is slow)"""
+    return ImageFont.truetype(font_path, font_size)
+
+
+@lru_cache(maxsize=256)
+def _parse_color(color: str) -> str:
+    """Color name or #RRGGBB / 0xRRGGBB to 0xRRGGBB (memoized per color)"""
+    # Check if it's a named color from config
+    named = config.TEXT_OVERLAY_COLORS.get(color)
+    if named:
+        return named
+    
+    # Check if it's already in hex format
+    if color.startswith('#'):
+        # Convert #RRGGBB to 0xRRGGBB
+        return '0x' + color[1:]
+    if color.startswith('0x'):
+        # Already in correct format
+        return color
+    
+    # Default to black if unrecognized
+    if config.DEBUG:
+        print(f"Unrecognized color '{color}', defaulting to black")
+    return config.TEXT_OVERLAY_COLORS['black']
 
 
 class TextOverlayProcessor:
@@ -19,6 +89,9 @@ class TextOverlayProcessor:
         """Initialize text overlay processor"""
         self.temp_dir = config.TEMP_DIR
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Pre-rendered caption images, reused across runs
+        self.render_cache_dir = self.temp_dir / "text_cache"
     
     def process(
         self,
@@ -27,11 +100,16 @@ class TextOverlayProcessor:
         text: str,
         box_color: str = 'black',
         text_color: str = 'white',
-        box_opacity: float = 0.7
+        box_opacity: float = 0.7,
+        start: Optional[float] = None,
+        end: Optional[float] = None
     ) -> Optional[str]:
         """
         Overlay text with background box on video
         
+        With a start/end window only the keyframe-aligned span around the
+        caption is re-encoded; the rest of the clip is stream-copied.
+        
         Args:
             video_path: Input video path
             output_path: Output video path
@@ -39,10 +117,15 @@ class TextOverlayProcessor:
             box_color: Background box color (named color or hex)
             text_color: Text color (named color or hex)
             box_opacity: Box opacity (0-1)
+            start: Show the caption from this time in seconds (None = from the start)
+            end: Hide the caption after this time in seconds (None = until the end)
             
         Returns:
             Path to output video or None if failed
         """
+        text_path = None
+        text_file = None
+        
         try:
             # Validate video exists
             if not os.path.exists(video_path):
@@ -94,14 +177,10 @@ class TextOverlayProcessor:
                 print(f"Box color (hex): {box_color_hex}")
                 print(f"Text color (hex): {text_color_hex}")
             
-            # Escape text for FFmpeg
-            escaped_text = self._escape_text(text)
-            
-            # Build FFmpeg filter complex
-            filter_complex = self._build_filter_complex(
-                video_width=video_width,
-                video_height=video_height,
-                text=escaped_text,
+            # The caption is static - render box + text once to a PNG and
+            # just overlay it, instead of drawtext rasterizing every frame
+            overlay_image = self._render_overlay_image(
+                text=text,
                 box_color=box_color_hex,
                 text_color=text_color_hex,
                 box_opacity=box_opacity,
@@ -110,17 +189,100 @@ class TextOverlayProcessor:
                 box_height=box_height
             )
             
-            if config.VERBOSE or config.DEBUG:
-                print(f"\n=== FILTER COMPLEX ===")
-                print(filter_complex)
-                print(f"======================\n")
+            if not overlay_image:
+                # drawtext reads the text from a file, so it needs no escaping
+                with tempfile.NamedTemporaryFile(
+                    'w', encoding='utf-8', suffix='.txt', delete=False, dir=str(self.temp_dir)
+                ) as f:
+                    f.write(text)
+                    text_path = f.name
+                
+                # Forward slashes keep Windows paths free of filter escapes
+                text_file = Path(text_path).as_posix()
             
-            # Execute FFmpeg command
-            success = self._execute_ffmpeg(
-                video_path=video_path,
-                output_path=output_path,
-                filter_complex=filter_complex
-            )
+            def build_filter(offset: float) -> str:
+                # offset: source time at which the encoded input starts
+                enable = self._enable_expr(start, end, offset)
+                
+                if overlay_image:
+                    filter_complex = (
+                        f"[0:v][1:v]overlay="
+                        f"x=(W-w)/2:"
+                        f"y=H-h-{config.TEXT_OVERLAY_BOTTOM_MARGIN}"
+                    )
+                    return f"{filter_complex}:enable='{enable}'" if enable else filter_complex
+                
+                # Build FFmpeg filter complex
+                return self._build_filter_complex(
+                    video_width=video_width,
+                    video_height=video_height,
+                    text_path=text_file,
+                    box_color=box_color_hex,
+                    text_color=text_color_hex,
+                    box_opacity=box_opacity,
+                    font_size=font_size,
+                    box_width=box_width,
+                    box_height=box_height,
+                    enable=enable
+                )
+            
+            success = False
+            
+            # Caption limited to part of the clip - encode just that part
+            cut = self._find_cut_points(video_path, start, end)
+            if cut:
+                cut_start, cut_end = cut
+                filter_complex = build_filter(cut_start)
+                
+                if config.VERBOSE:
+                    print(f"Smart cut: re-encoding {cut_start:.2f}s - "
+                          f"{'end' if cut_end is None else f'{cut_end:.2f}s'}")
+                
+                success = self._execute_smart_cut(
+                    video_path=video_path,
+                    output_path=output_path,
+                    filter_complex=filter_complex,
+                    overlay_image=overlay_image,
+                    cut_start=cut_start,
+                    cut_end=cut_end
+                )
+            
+            # NVENC: decode, blend and encode all in GPU memory
+            no_window = start is None and end is None
+            if not success and overlay_image and no_window and self._can_overlay_on_gpu():
+                # overlay_cuda only blends yuva420p onto yuv420p - CUDA
+                # decodes to nv12, so the main frames are converted first
+                filter_complex = (
+                    f"[1:v]format=yuva420p,hwupload_cuda[caption];"
+                    f"[0:v]scale_cuda=format=yuv420p[main];"
+                    f"[main][caption]overlay_cuda="
+                    f"x={(video_width - box_width) // 2}:"
+                    f"y={video_height - box_height - config.TEXT_OVERLAY_BOTTOM_MARGIN}"
+                )
+                
+                success = self._execute_ffmpeg(
+                    video_path=video_path,
+                    output_path=output_path,
+                    filter_complex=filter_complex,
+                    overlay_image=overlay_image,
+                    cuda=True
+                )
+            
+            if not success:
+                filter_complex = build_filter(0.0)
+                
+                if config.VERBOSE or config.DEBUG:
+                    print(f"\n=== FILTER COMPLEX ===")
+                    print(filter_complex)
+                    print(f"======================\n")
+                
+                # Execute FFmpeg command
+                success = self._execute_ffmpeg(
+                    video_path=video_path,
+                    output_path=output_path,
+                    filter_complex=filter_complex,
+                    overlay_image=overlay_image
+                )
             
             if success and os.path.exists(output_path):
                 if config.VERBOSE:
@@ -135,6 +297,35 @@ class TextOverlayProcessor:
                 import traceback
                 traceback.print_exc()
             return None
+        
+        finally:
+            if text_path and os.path.exists(text_path):
+                os.unlink(text_path)
+    
+    def _measure_text_width(self, text: str, font_size: int) -> Optional[int]:
+        """
+        Measure rendered text width with the overlay font
+        
+        Only possible when a font file is known (drawtext then renders
+        with the same file) and Pillow is installed.
+        
+        Args:
+            text: Text to display
+            font_size: Font size in pixels
+            
+        Returns:
+            Width in pixels or None if the text can't be measured
+        """
+        font_path = _font_path()
+        if ImageFont is None or not font_path:
+            return None
+        
+        try:
+            return int(round(_load_font(font_path, font_size).getlength(text)))
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Could not measure text with {font_path}: {str(e)}")
+            return None
     
     def _calculate_font_size(self, text: str, video_width: int) -> int:
         """
@@ -155,10 +346,24 @@ class TextOverlayProcessor:
         if char_count == 0:
             return config.TEXT_OVERLAY_MAX_FONT_SIZE
         
+        min_size = config.TEXT_OVERLAY_MIN_FONT_SIZE
+        max_size = config.TEXT_OVERLAY_MAX_FONT_SIZE
+        
+        if self._measure_text_width(text, min_size) is not None:
+            # Binary search for the largest size whose measured width fits
+            low, high = min_size, max_size
+            while low < high:
+                mid = (low + high + 1) // 2
+                if self._measure_text_width(text, mid) <= available_width:
+                    low = mid
+                else:
+                    high = mid - 1
+            return low
+        
         # Estimate character width as 0.6 * font_size (average for most fonts)
         # Formula: available_width = char_count * (font_size * 0.6)
         # Solve for font_size: font_size = available_width / (char_count * 0.6)
-        font_size = int(available_width / (char_count * 0.6))
+        font_size = int(available_width / (char_count * CHAR_WIDTH_RATIO))
         
         # Clamp between minimum and maximum
         font_size = max(
@@ -181,8 +386,10 @@ class TextOverlayProcessor:
         """
         padding = config.TEXT_OVERLAY_PADDING
         
-        # Estimate text width (character count * font_size * 0.6)
-        text_width = int(len(text) * font_size * 0.6)
+        # Measured text width, else estimate (character count * font_size * 0.6)
+        text_width = self._measure_text_width(text, font_size)
+        if text_width is None:
+            text_width = int(len(text) * font_size * CHAR_WIDTH_RATIO)
         
         # Box width = text width + padding on both sides
         box_width = text_width + (padding * 2)
@@ -202,60 +409,111 @@ class TextOverlayProcessor:
         Returns:
             Color in FFmpeg hex format (0xRRGGBB)
         """
-        # Check if it's a named color from config
-        if color in config.TEXT_OVERLAY_COLORS:
-            return config.TEXT_OVERLAY_COLORS[color]
-        
-        # Check if it's already in hex format
-        if color.startswith('#'):
-            # Convert #RRGGBB to 0xRRGGBB
-            return '0x' + color[1:]
-        elif color.startswith('0x'):
-            # Already in correct format
-            return color
-        
-        # Default to black if unrecognized
-        if config.DEBUG:
-            print(f"Unrecognized color '{color}', defaulting to black")
-        return config.TEXT_OVERLAY_COLORS['black']
+        return _parse_color(color)
     
-    def _escape_text(self, text: str) -> str:
+    def _render_overlay_image(
+        self,
+        text: str,
+        box_color: str,
+        text_color: str,
+        box_opacity: float,
+        font_size: int,
+        box_width: int,
+        box_height: int
+    ) -> Optional[str]:
         """
-        Escape special characters for FFmpeg drawtext filter
+        Render the background box and text to an RGBA PNG (cached on disk)
         
-        FFmpeg drawtext requires escaping certain characters:
-        - Backslashes (\)
-        - Single quotes (')
-        - Colons (:)
+        Needs Pillow and a font file - the same font drawtext would use,
+        so both paths look alike.
         
         Args:
-            text: Original text
+            text: Text to display
+            box_color: Box color in hex format
+            text_color: Text color in hex format
+            box_opacity: Box opacity (0-1)
+            font_size: Font size in pixels
+            box_width: Box width
+            box_height: Box height
             
         Returns:
-            Escaped text safe for FFmpeg
+            Path to the PNG, or None to fall back to drawbox/drawtext
         """
-        # Escape backslashes first (must be done first!)
-        text = text.replace('\\', '\\\\\\\\')
+        font_path = _font_path()
+        if Image is None or not font_path:
+            return None
         
-        # Escape single quotes
-        text = text.replace("'", "\\'")
+        try:
+            key = hashlib.sha1(
+                f"{text}\0{font_path}\0{font_size}\0{box_width}x{box_height}\0"
+                f"{box_color}\0{text_color}\0{box_opacity}".encode('utf-8')
+            ).hexdigest()
+            cached_path = self.render_cache_dir / f"{key}.png"
+            
+            if cached_path.exists():
+                return str(cached_path)
+            
+            box_rgb = self._hex_to_rgb(box_color)
+            text_rgb = self._hex_to_rgb(text_color)
+            
+            img = Image.new('RGBA', (box_width, box_height), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(img)
+            
+            # Filled box, then text centered in it
+            draw.rectangle(
+                (0, 0, box_width - 1, box_height - 1),
+                fill=(*box_rgb, int(round(box_opacity * 255)))
+            )
+            draw.text(
+                (box_width / 2, box_height / 2),
+                text,
+                font=_load_font(font_path, font_size),
+                fill=(*text_rgb, 255),
+                anchor='mm'
+            )
+            
+            self.render_cache_dir.mkdir(parents=True, exist_ok=True)
+            
+            # Write then rename so concurrent jobs never see a partial file
+            with tempfile.NamedTemporaryFile(
+                suffix='.png', delete=False, dir=str(self.render_cache_dir)
+            ) as f:
+                img.save(f, format='PNG')
+                tmp_path = f.name
+            
+            os.replace(tmp_path, cached_path)
+            return str(cached_path)
         
-        # Escape colons
-        text = text.replace(':', '\\:')
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Could not pre-render text, using drawtext: {str(e)}")
+            return None
+    
+    def _hex_to_rgb(self, color: str) -> Tuple[int, int, int]:
+        """
+        Convert 0xRRGGBB / #RRGGBB to an (r, g, b) tuple
         
-        return text
+        Args:
+            color: Color in hex format
+            
+        Returns:
+            Tuple of (r, g, b)
+        """
+        value = int(color[2:] if color.startswith('0x') else color.lstrip('#'), 16)
+        return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
     
     def _build_filter_complex(
         self,
         video_width: int,
         video_height: int,
-        text: str,
+        text_path: str,
         box_color: str,
         text_color: str,
         box_opacity: float,
         font_size: int,
         box_width: int,
-        box_height: int
+        box_height: int,
+        enable: Optional[str] = None
     ) -> str:
         """
         Build FFmpeg filter_complex for text overlay
@@ -267,13 +525,14 @@ class TextOverlayProcessor:
         Args:
             video_width: Video width
             video_height: Video height
-            text: Escaped text to display
+            text_path: File holding the text to display (raw UTF-8)
             box_color: Box color in hex format
             text_color: Text color in hex format
             box_opacity: Box opacity (0-1)
             font_size: Font size in pixels
             box_width: Box width
             box_height: Box height
+            enable: Timeline expression for when the caption shows (None = always)
             
         Returns:
             FFmpeg filter_complex string
@@ -305,27 +564,305 @@ class TextOverlayProcessor:
         )
         
         # Build drawtext filter
-        # Draws text with specified font size and color
+        # Draws text with specified font size and color, using the
+        # overlay font file (the one text widths are measured with)
+        font_path = _font_path()
+        font_option = f"fontfile='{Path(font_path).as_posix()}':" if font_path else ""
+        
         drawtext = (
             f"drawtext="
-            f"text='{text}':"
+            f"{font_option}"
+            f"textfile='{text_path}':"
             f"x={text_x}:"
             f"y={text_y}:"
             f"fontsize={font_size}:"
             f"fontcolor={text_color}"
         )
         
+        # Limit both filters to the caption window
+        if enable:
+            drawbox += f":enable='{enable}'"
+            drawtext += f":enable='{enable}'"
+        
         # Combine filters with comma (sequential application)
         # First draw box, then draw text on top
         filter_complex = f"{drawbox},{drawtext}"
         
         return filter_complex
     
+    def _enable_expr(
+        self,
+        start: Optional[float],
+        end: Optional[float],
+        offset: float
+    ) -> Optional[str]:
+        """
+        Timeline expression for the caption window
+        
+        Args:
+            start: Caption start in source seconds (None = from the start)
+            end: Caption end in source seconds (None = until the end)
+            offset: Source time at which the filtered input starts
+            
+        Returns:
+            Expression for a filter's enable option, or None to always show
+        """
+        if start is None and end is None:
+            return None
+        
+        start = max((start or 0.0) - offset, 0.0)
+        if end is None:
+            return f"gte(t,{start:g})"
+        
+        return f"between(t,{start:g},{end - offset:g})"
+    
+    def _find_cut_points(
+        self,
+        video_path: str,
+        start: Optional[float],
+        end: Optional[float]
+    ) -> Optional[Tuple[float, Optional[float]]]:
+        """
+        Keyframe-aligned span to re-encode for a caption window
+        
+        Stream-copied parts are spliced with the re-encoded one, so the
+        source must already be what libx264 produces: 8-bit 4:2:0
+        (yuv420p) H.264.
+        
+        Args:
+            video_path: Input video path
+            start: Caption start in seconds (None = from the start)
+            end: Caption end in seconds (None = until the end)
+            
+        Returns:
+            (cut_start, cut_end) - last keyframe at/before start and first
+            keyframe at/after end (None = until the end) - or None when the
+            whole clip has to be encoded anyway
+        """
+        if start is None and end is None:
+            return None
+        
+        info = get_video_info(video_path)
+        if not info or info['video_codec'] != 'h264':
+            return None
+        
+        # The middle part is forced to yuv420p; splicing it between 10-bit,
+        # 4:2:2/4:4:4 or full-range (yuvj420p) parts changes the format
+        # mid-stream without ffmpeg complaining
+        if info.get('pix_fmt') != 'yuv420p':
+            return None
+        
+        keyframes = get_keyframe_times(video_path)
+        if not keyframes:
+            return None
+        
+        start = start or 0.0
+        cut_start = max((k for k in keyframes if k <= start), default=keyframes[0])
+        
+        cut_end = None
+        if end is not None:
+            cut_end = min((k for k in keyframes if k >= end and k > cut_start), default=None)
+        
+        # Caption starts in the first GOP - nothing to copy before it
+        if cut_start <= keyframes[0]:
+            if cut_end is None:
+                return None
+            cut_start = 0.0
+        
+        return cut_start, cut_end
+    
+    def _execute_smart_cut(
+        self,
+        video_path: str,
+        output_path: str,
+        filter_complex: str,
+        overlay_image: Optional[str],
+        cut_start: float,
+        cut_end: Optional[float]
+    ) -> bool:
+        """
+        Re-encode only [cut_start, cut_end) and stream-copy the rest
+        
+        Video parts go through MPEG-TS, are joined with the concat
+        demuxer, and the source audio is copied over unchanged. The MP4
+        keeps a single SPS/PPS (avcC) for the whole stream, so the middle
+        part is encoded with libx264 at the source's profile, level and
+        entropy coding, and the cut is abandoned unless its parameter sets
+        come out identical to the source's.
+        
+        Args:
+            video_path: Input video path
+            output_path: Output video path
+            filter_complex: FFmpeg filter string, timed from cut_start
+            overlay_image: Pre-rendered caption PNG, or None for drawtext
+            cut_start: Keyframe time where re-encoding starts
+            cut_end: Keyframe time where stream copy resumes (None = end)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        parts = []
+        list_path = None
+        
+        def temp_path(suffix: str) -> str:
+            with tempfile.NamedTemporaryFile(
+                suffix=suffix, delete=False, dir=str(self.temp_dir)
+            ) as f:
+                return f.name
+        
+        try:
+            source_sets = get_h264_parameter_sets(video_path)
+            encoder_args = self._smart_cut_encoder_args(source_sets)
+            if not encoder_args:
+                return False
+            
+            base = ['ffmpeg', '-hide_banner', '-nostats', '-nostdin']
+            commands = []
+            
+            # Before the caption: copied up to the first re-encoded keyframe
+            if cut_start > 0:
+                head = temp_path('.ts')
+                parts.append(head)
+                commands.append([
+                    *base, '-i', video_path,
+                    '-map', '0:v:0', '-c', 'copy', '-to', f"{cut_start:g}",
+                    '-y', head
+                ])
+            
+            # Caption span: seeking to a keyframe makes the cut frame exact
+            if overlay_image:
+                filter_args = ['-i', overlay_image, '-filter_complex', filter_complex]
+            else:
+                filter_args = ['-vf', filter_complex]
+            
+            middle = temp_path('.ts')
+            parts.append(middle)
+            commands.append([
+                *base, '-ss', f"{cut_start:g}", '-i', video_path,
+                *filter_args,
+                *(['-t', f"{cut_end - cut_start:g}"] if cut_end is not None else []),
+                '-an',
+                *encoder_args,
+                '-threads', str(config.FFMPEG_THREADS),
+                '-y', middle
+            ])
+            
+            # After the caption: copied from the next keyframe on
+            if cut_end is not None:
+                tail = temp_path('.ts')
+                parts.append(tail)
+                commands.append([
+                    *base, '-ss', f"{cut_end:g}", '-i', video_path,
+                    '-map', '0:v:0', '-c', 'copy',
+                    '-y', tail
+                ])
+            
+            list_path = temp_path('.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                for part in parts:
+                    f.write(f"file '{Path(part).as_posix()}'\n")
+            
+            commands.append([
+                *base,
+                '-f', 'concat', '-safe', '0', '-i', list_path,
+                '-i', video_path,
+                '-map', '0:v', '-map', '1:a?',
+                '-c', 'copy',
+                '-movflags', 'faststart',
+                '-y', output_path
+            ])
+            
+            for cmd in commands:
+                if config.VERBOSE or config.DEBUG:
+                    print(f"\n=== FFMPEG COMMAND ===")
+                    print(' '.join(cmd))
+                    print(f"======================\n")
+                
+                returncode, stderr_tail = run_ffmpeg(cmd)
+                if returncode != 0:
+                    if config.DEBUG:
+                        print(f"Smart cut failed (return code {returncode}), re-encoding whole clip:")
+                        print(f"STDERR: {stderr_tail}")
+                    return False
+                
+                # Other SPS/PPS would decode the copied parts with the
+                # wrong parameters
+                if cmd[-1] == middle and get_h264_parameter_sets(middle) != source_sets:
+                    if config.DEBUG:
+                        print("Smart cut parameter sets don't match the source, "
+                              "re-encoding whole clip")
+                    return False
+            
+            return True
+        
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error in smart cut: {str(e)}")
+            return False
+        
+        finally:
+            for path in [*parts, list_path]:
+                if path and os.path.exists(path):
+                    os.unlink(path)
+    
+    def _smart_cut_encoder_args(self, parameter_sets: List[bytes]) -> Optional[List[str]]:
+        """
+        libx264 arguments matching a source's SPS/PPS
+        
+        Always libx264, whatever encoder config.VIDEO_CODEC or the hardware
+        detection picks - hardware encoders write their own SPS/PPS.
+        
+        Args:
+            parameter_sets: Source SPS and PPS NAL units
+            
+        Returns:
+            List of FFmpeg arguments, or None when libx264 can't produce
+            the source's profile
+        """
+        sps = [nal for nal in parameter_sets if nal[0] & 0x1F == 7]
+        pps = [nal for nal in parameter_sets if nal[0] & 0x1F == 8]
+        if len(sps) != 1 or len(pps) != 1 or len(sps[0]) < 4:
+            return None
+        
+        profile = X264_PROFILES.get(sps[0][1])
+        if not profile:
+            return None
+        
+        # Baseline has no CABAC; libx264 drops it there on its own
+        args = [
+            '-c:v', 'libx264',
+            '-preset', config.VIDEO_PRESET,
+            '-crf', str(config.VIDEO_CRF),
+            '-pix_fmt', 'yuv420p',
+            '-profile:v', profile,
+            '-level', f"{sps[0][3] / 10:g}",
+        ]
+        if profile != 'baseline':
+            args += ['-coder', 'cabac' if h264_pps_uses_cabac(pps[0]) else 'cavlc']
+        
+        return args
+    
+    def _can_overlay_on_gpu(self) -> bool:
+        """
+        Check if the caption can be blended on the GPU
+        
+        Only worth it when NVENC encodes the result - frames then never
+        leave GPU memory between decode and encode. Needs scale_cuda too,
+        to bring the decoded frames to the format overlay_cuda blends onto.
+        """
+        return (
+            detect_hw_encoder() == 'h264_nvenc'
+            and has_filter('overlay_cuda')
+            and has_filter('scale_cuda')
+        )
+    
     def _execute_ffmpeg(
         self,
         video_path: str,
         output_path: str,
-        filter_complex: str
+        filter_complex: str,
+        overlay_image: Optional[str] = None,
+        cuda: bool = False
     ) -> bool:
         """
         Execute FFmpeg command to apply text overlay
@@ -334,19 +871,33 @@ class TextOverlayProcessor:
             video_path: Input video path
             output_path: Output video path
             filter_complex: FFmpeg filter string
+            overlay_image: Pre-rendered caption PNG (second input of
+                           filter_complex), or None for a -vf filter chain
+            cuda: Decode the video into CUDA frames (for overlay_cuda)
             
         Returns:
             True if successful, False otherwise
         """
         try:
+            if overlay_image:
+                # Single-frame PNG input; overlay keeps showing its last
+                # (only) frame for the whole video
+                filter_args = ['-i', overlay_image, '-filter_complex', filter_complex]
+            else:
+                filter_args = ['-vf', filter_complex]
+            
+            # Keep decoded frames on the GPU
+            hwaccel_args = ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'] if cuda else []
+            
             # Build FFmpeg command
             cmd = [
                 'ffmpeg',
+                '-hide_banner', '-nostats',          # No banner or progress lines
+                '-nostdin',                          # No keyboard polling
+                *hwaccel_args,                       # GPU decode (overlay_cuda only)
                 '-i', video_path,                    # Input video
-                '-vf', filter_complex,               # Video filter
-                '-codec:v', config.VIDEO_CODEC,      # Video codec (h264)
-                '-preset', config.VIDEO_PRESET,      # Encoding preset (medium)
-                '-crf', str(config.VIDEO_CRF),       # Quality (23)
+                *filter_args,                        # Caption image + overlay, or drawtext
+                *get_video_encoder_args(),           # Video codec (h264, GPU if available)
                 '-codec:a', 'copy',                  # Copy audio stream (no re-encode)
                 '-movflags', 'faststart',            # Enable fast start for web playback
                 '-threads', str(config.FFMPEG_THREADS),  # Multi-threading
@@ -359,19 +910,14 @@ class TextOverlayProcessor:
                 print(' '.join(cmd))
                 print(f"======================\n")
             
-            # Execute FFmpeg
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True
-            )
+            # Execute FFmpeg (stderr is streamed; only its tail is kept)
+            returncode, stderr_tail = run_ffmpeg(cmd)
             
             # Check for errors
-            if result.returncode != 0:
+            if returncode != 0:
                 if config.DEBUG:
-                    print(f"FFmpeg error (return code {result.returncode}):")
-                    print(f"STDERR: {result.stderr}")
-                    print(f"STDOUT: {result.stdout}")
+                    print(f"FFmpeg error (return code {returncode}):")
+                    print(f"STDERR: {stderr_tail}")
                 return False
             
             if config.VERBOSE:
@@ -434,13 +980,28 @@ class TextOverlayProcessor:
 # MODULE-LEVEL CONVENIENCE FUNCTIONS
 # ============================================================================
 
+# Shared instance for the module-level functions (constructing one creates
+# temp_dir)
+_DEFAULT_PROCESSOR: Optional[TextOverlayProcessor] = None
+
+
+def _processor() -> TextOverlayProcessor:
+    """Get the shared TextOverlayProcessor, creating it on first use"""
+    global _DEFAULT_PROCESSOR
+    if _DEFAULT_PROCESSOR is None:
+        _DEFAULT_PROCESSOR = TextOverlayProcessor()
+    return _DEFAULT_PROCESSOR
+
+
 def overlay_text_on_video(
     video_path: str,
     output_path: str,
     text: str,
     box_color: str = 'black',
     text_color: str = 'white',
-    box_opacity: float = 0.7
+    box_opacity: float = 0.7,
+    start: Optional[float] = None,
+    end: Optional[float] = None
 ) -> Optional[str]:
     """
     Main function to overlay text on video with background box
@@ -452,6 +1013,8 @@ def overlay_text_on_video(
         box_color: Background box color (named or hex)
         text_color: Text color (named or hex)
         box_opacity: Box opacity (0-1)
+        start: Show the caption from this time in seconds (None = from the start)
+        end: Hide the caption after this time in seconds (None = until the end)
         
     Returns:
         Path to output video or None if failed
@@ -468,14 +1031,16 @@ def overlay_text_on_video(
         >>> print(result)
         'output.mp4'
     """
-    processor = TextOverlayProcessor()
+    processor = _processor()
     return processor.process(
         video_path=video_path,
         output_path=output_path,
         text=text,
         box_color=box_color,
         text_color=text_color,
-        box_opacity=box_opacity
+        box_opacity=box_opacity,
+        start=start,
+        end=end
     )
 
 
@@ -539,5 +1104,5 @@ def preview_text_overlay(
         >>> print(f"Font size: {preview['font_size']}px")
         >>> print(f"Box size: {preview['box_width']}x{preview['box_height']}px")
     """
-    processor = TextOverlayProcessor()
+    processor = _processor()
     return processor.preview_settings(video_path, text)
\ No newline at end of file
@@ -5,13 +5,90 @@ Handles video cutting at specified timestamps
 
 import os
 import random
-import subprocess
 import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict
-import ffmpeg
+
+import numpy as np
 
 import config
+from utils.ffmpeg_helper import (
+    detect_hw_encoder, get_keyframe_times, get_video_encoder_args,
+    get_video_info, probe_file, run_ffmpeg,
+)
+
+
+# Stream-copied segments may start up to this far (seconds) from the
+# requested start before the segment is re-encoded instead; their length
+# must still match to within one frame
+COPY_TOLERANCE = 0.2
+
+# Intermediate segments are MPEG-TS: no moov atom to write at close, and
+# parameter sets are in-band so pieces concat cleanly with -c copy
+SEGMENT_CONTAINER = 'mpegts'
+SEGMENT_EXTENSIONS = {'mp4': '.mp4', 'mpegts': '.ts'}
+
+# Concurrent NVENC sessions allowed on consumer NVIDIA cards
+NVENC_MAX_SESSIONS = 3
+
+# Most segments cut_and_merge_gpu handles in one run - every segment is a
+# separate input with its own NVDEC decoder
+GPU_MAX_SEGMENTS = 32
+
+
+@lru_cache(maxsize=32)
+def _segment_video_args(hw_encoder: Optional[str], codec: str, crf: int) -> Tuple[str, ...]:
+    """
+    Video encoder arguments for segments (see VideoCutter._encoder_args)
+    
+    Segments favour encode speed: NVENC's fastest preset with the
+    low-latency tune at constant QP, x264's ultrafast.
+    """
+    if hw_encoder == 'h264_nvenc':
+        return (
+            '-c:v', hw_encoder,
+            '-preset', 'p1',
+            '-tune', 'll',
+            '-rc', 'constqp',
+            '-qp', str(crf),
+            # Forced keyframes as IDR frames - otherwise they're plain
+            # I-frames, not flagged as keyframes, and the segment muxer
+            # won't split on them
+            '-forced-idr', '1',
+        )
+    if hw_encoder:
+        # QSV is already on veryfast; others have no speed preset
+        return tuple(get_video_encoder_args(crf))
+    
+    return (
+        '-c:v', codec,
+        '-preset', 'ultrafast',  # Fast for segments
+        '-crf', str(crf),
+    )
+
+
+@lru_cache(maxsize=32)
+def _extract_output_args(
+    hw_encoder: Optional[str],
+    codec: str,
+    crf: int,
+    audio_codec: str,
+    audio_bitrate: str,
+    container: str
+) -> Tuple[str, ...]:
+    """Everything after -t in an extract_segment command, except the output path"""
+    return (
+        *_segment_video_args(hw_encoder, codec, crf),
+        '-c:a', audio_codec,
+        '-b:a', audio_bitrate,
+        '-avoid_negative_ts', 'make_zero',
+        '-f', container,
+        '-y',
+    )
 
 
 class VideoCutter:
@@ -21,13 +98,26 @@ class VideoCutter:
         """Initialize video cutter"""
         self.temp_dir = config.TEMP_DIR
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        
+        # GPU encoder for segments (detected once per process), or None
+        self.hw_encoder = detect_hw_encoder()
+        
+        # Caps FFmpeg processes across everything this cutter runs at
+        # once (parallel segments, and concurrent reels in cut_and_merge_batch)
+        max_processes = os.cpu_count() or 1
+        if self.hw_encoder == 'h264_nvenc':
+            max_processes = min(max_processes, NVENC_MAX_SESSIONS)
+        self.max_processes = max_processes
+        self._ffmpeg_slots = threading.BoundedSemaphore(max_processes)
     
     def extract_segment(
         self,
         video_path: str,
         start_time: float,
         duration: float,
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        container: str = 'mp4',
+        allow_copy: bool = True
     ) -> Optional[str]:
         """
         Extract a segment from video
@@ -37,6 +127,9 @@ class VideoCutter:
             start_time: Start time in seconds
             duration: Duration in seconds
             output_path: Output path (optional)
+            container: Output format, 'mp4' or 'mpegts'
+            allow_copy: Stream copy when the cut allows it; pass False for
+                segments joined with encoded ones (see _copy_segment)
             
         Returns:
             Path to extracted segment or None
@@ -48,33 +141,47 @@ class VideoCutter:
             # Generate output path if not provided
             if output_path is None:
                 output_path = str(
-                    self.temp_dir / f"segment_{start_time:.2f}_{duration:.2f}.mp4"
+                    self.temp_dir
+                    / f"segment_{start_time:.2f}_{duration:.2f}{SEGMENT_EXTENSIONS[container]}"
                 )
             
-            # Extract segment using FFmpeg
-            cmd = [
-                'ffmpeg',
-                '-ss', str(start_time),
-                '-i', video_path,
-                '-t', str(duration),
-                '-c:v', config.VIDEO_CODEC,
-                '-preset', 'ultrafast',  # Fast for segments
-                '-crf', str(config.VIDEO_CRF),
-                '-c:a', config.AUDIO_CODEC,
-                '-b:a', config.AUDIO_BITRATE,
-                '-avoid_negative_ts', 'make_zero',
-                '-y',
-                output_path
-            ]
+            # Cut on a keyframe - a remux is enough
+            if allow_copy and self._copy_segment(
+                video_path, start_time, duration, output_path, container
+            ):
+                return output_path
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True
+            # Same for every segment of a run - built once
+            output_args = _extract_output_args(
+                self.hw_encoder,
+                config.VIDEO_CODEC,
+                config.VIDEO_CRF,
+                config.AUDIO_CODEC,
+                config.AUDIO_BITRATE,
+                container
             )
             
-            if result.returncode == 0 and os.path.exists(output_path):
-                return output_path
+            # NVENC: decode on the GPU too, frames stay in GPU memory
+            if self.hw_encoder == 'h264_nvenc':
+                hwaccel_options = [['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'], []]
+            else:
+                hwaccel_options = [[]]
+            
+            # Without GPU decode if the source codec isn't supported by it
+            for hwaccel_args in hwaccel_options:
+                # Extract segment using FFmpeg
+                cmd = [
+                    *hwaccel_args,
+                    '-ss', str(start_time),
+                    '-i', video_path,
+                    '-t', str(duration),
+                    *output_args,
+                    output_path
+                ]
+                
+                # FFmpeg only exits 0 once the output is written
+                if self._run_ffmpeg(cmd):
+                    return output_path
             
             return None
         
@@ -83,6 +190,242 @@ class VideoCutter:
                 print(f"Error extracting segment: {str(e)}")
             return None
     
+    def _run_ffmpeg(self, args: List[str]) -> bool:
+        """
+        Run FFmpeg quietly (errors only, no stats, no stdin)
+        
+        Args:
+            args: FFmpeg arguments, without the 'ffmpeg' program name
+            
+        Returns:
+            True if FFmpeg exited successfully
+        """
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostats', '-nostdin', *args]
+        
+        # Only the tail of stderr is kept, and only decoded on failure
+        with self._ffmpeg_slots:
+            returncode, stderr_tail = run_ffmpeg(cmd)
+        
+        if returncode != 0 and config.DEBUG:
+            print(f"FFmpeg error (return code {returncode}):")
+            print(f"STDERR: {stderr_tail}")
+        
+        return returncode == 0
+    
+    def _encoder_args(self) -> List[str]:
+        """
+        Video encoder arguments for segments
+        
+        Returns:
+            List of FFmpeg arguments starting with '-c:v'
+        """
+        return list(_segment_video_args(self.hw_encoder, config.VIDEO_CODEC, config.VIDEO_CRF))
+    
+    def _split_sequential(
+        self,
+        video_path: str,
+        segment_durations: List[float],
+        prefix: str = 'segment_'
+    ) -> Optional[List[str]]:
+        """
+        Cut consecutive segments from the start of a video in one pass
+        
+        One decode + encode with the segment muxer instead of one FFmpeg
+        run per segment; keyframes are forced at the cut points so every
+        piece starts exactly where it should.
+        
+        Args:
+            video_path: Input video path
+            segment_durations: Segment durations, taken back to back from 0
+            prefix: File name prefix for the segments
+            
+        Returns:
+            List of segment file paths, or None if splitting failed
+        """
+        cut_times = []
+        position = 0.0
+        for seg_duration in segment_durations[:-1]:
+            position += seg_duration
+            cut_times.append(f"{position:.3f}")
+        total = position + segment_durations[-1]
+        
+        extension = SEGMENT_EXTENSIONS[SEGMENT_CONTAINER]
+        pattern = str(self.temp_dir / f"{prefix}%04d{extension}")
+        
+        cmd = [
+            '-i', video_path,
+            '-t', str(total),
+            '-map', '0:v:0', '-map', '0:a:0?',
+            *self._encoder_args(),
+            '-c:a', config.AUDIO_CODEC,
+            '-b:a', config.AUDIO_BITRATE,
+        ]
+        if cut_times:
+            cut_list = ','.join(cut_times)
+            cmd += ['-force_key_frames', cut_list, '-segment_times', cut_list]
+        cmd += [
+            '-f', 'segment',
+            '-segment_format', SEGMENT_CONTAINER,
+            '-reset_timestamps', '1',
+            '-y',
+            pattern
+        ]
+        
+        success = self._run_ffmpeg(cmd)
+        
+        segments = [pattern % i for i in range(len(segment_durations))]
+        if not success or not all(os.path.exists(path) for path in segments):
+            self.cleanup_segments(segments)
+            return None
+        
+        # Rounding at the very end can leave a sliver of an extra piece
+        leftover = pattern % len(segment_durations)
+        try:
+            os.unlink(leftover)
+        except FileNotFoundError:
+            pass
+        
+        return segments
+    
+    def _copy_start(self, video_path: str, start_time: float) -> Optional[float]:
+        """
+        Keyframe a stream copy of a segment starting at start_time would use
+        
+        Args:
+            video_path: Input video path
+            start_time: Start time in seconds
+            
+        Returns:
+            Keyframe time within COPY_TOLERANCE of start_time, or None if
+            the segment can't be copied (no such keyframe, or the source
+            isn't H.264/AAC like encoded segments)
+        """
+        info = get_video_info(video_path)
+        if not info or info['video_codec'] != 'h264' or info['audio_codec'] not in ('aac', 'none'):
+            return None
+        
+        keyframes = get_keyframe_times(video_path)
+        keyframe = min(keyframes, key=lambda k: abs(k - start_time), default=None)
+        if keyframe is None or abs(keyframe - start_time) > COPY_TOLERANCE:
+            return None
+        
+        return keyframe
+    
+    def _copy_segment(
+        self,
+        video_path: str,
+        start_time: float,
+        duration: float,
+        output_path: str,
+        container: str = 'mp4'
+    ) -> bool:
+        """
+        Extract a segment by stream copy, if that gives an accurate cut
+        
+        Copy can only start on a keyframe, so this is only tried when one
+        lies within COPY_TOLERANCE of start_time. The segment is cut from
+        that keyframe for exactly `duration` - the content shifts slightly,
+        but the length (and so the beat timing) doesn't - and is kept only
+        if it comes out within one frame of `duration`.
+        
+        A copied segment keeps the source's H.264 parameter sets (SPS/PPS),
+        which differ from an encoded segment's - and the merge copies the
+        video stream into MP4 with a single avcC. So the segments of one
+        reel must be all copied or all encoded, never mixed.
+        
+        Args:
+            video_path: Input video path
+            start_time: Start time in seconds
+            duration: Duration in seconds
+            output_path: Output path
+            container: Output format, 'mp4' or 'mpegts'
+            
+        Returns:
+            True if the copied segment was written
+        """
+        keyframe = self._copy_start(video_path, start_time)
+        if keyframe is None:
+            return False
+        
+        # A hair past the keyframe, so float rounding can't make the seek
+        # land on the previous one
+        cmd = [
+            '-ss', f"{keyframe + 0.001:.6f}",
+            '-i', video_path,
+            '-t', str(duration),
+            '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+            '-f', container,
+            '-y',
+            output_path
+        ]
+        
+        if not self._run_ffmpeg(cmd):
+            return False
+        
+        probe = probe_file(output_path)
+        copied = float(probe['format'].get('duration', 0)) if probe else 0.0
+        
+        fps = get_video_info(video_path)['fps']
+        frame_duration = 1.0 / fps if fps else 1.0 / 30
+        return abs(copied - duration) <= frame_duration
+    
+    def _plan_segments(
+        self,
+        video_duration: float,
+        timestamps: List[float],
+        audio_duration: float,
+        order: str
+    ) -> List[Tuple[float, float]]:
+        """
+        Decide where each segment is cut from the video
+        
+        Args:
+            video_duration: Source video duration in seconds
+            timestamps: List of cut points in seconds
+            audio_duration: Total audio duration to match
+            order: 'sequential' or 'random'
+            
+        Returns:
+            List of (start, duration) tuples, in output order
+        """
+        # Calculate segment durations based on timestamps
+        diffs = np.diff(np.asarray(timestamps, dtype=np.float64))
+        segment_durations = diffs[diffs > config.MIN_SEGMENT_DURATION].tolist()
+        
+        # If not enough segments, add remaining time
+        if segment_durations:
+            total_segments_duration = sum(segment_durations)
+            if total_segments_duration < audio_duration:
+                # Add one more segment
+                remaining = audio_duration - total_segments_duration
+                if remaining > config.MIN_SEGMENT_DURATION:
+                    segment_durations.append(remaining)
+        else:
+            # No valid segments, use entire video
+            segment_durations = [min(audio_duration, video_duration)]
+        
+        plan = []
+        current_video_time = 0.0
+        
+        for seg_duration in segment_durations:
+            # Ensure we don't exceed video duration
+            if current_video_time + seg_duration > video_duration:
+                # Loop back to start
+                current_video_time = 0.0
+            
+            plan.append((current_video_time, seg_duration))
+            
+            # Move to next position
+            if order == 'sequential':
+                current_video_time += seg_duration
+            else:  # random
+                # Pick random position in video
+                max_start = max(0, video_duration - seg_duration)
+                current_video_time = random.uniform(0, max_start)
+        
+        return plan
+    
     def create_segments_from_timestamps(
         self,
         video_path: str,
@@ -104,58 +447,75 @@ class VideoCutter:
         """
         try:
             # Get video info
-            probe = ffmpeg.probe(video_path)
+            # Shared probe cache (keyed by path, mtime and size) - a source
+            # reused across reels is probed once
+            probe = probe_file(video_path)
+            if not probe:
+                return []
             video_duration = float(probe['format']['duration'])
             
-            # Calculate segment durations based on timestamps
-            segment_durations = []
-            for i in range(len(timestamps) - 1):
-                duration = timestamps[i + 1] - timestamps[i]
-                if duration > config.MIN_SEGMENT_DURATION:
-                    segment_durations.append(duration)
-            
-            # If not enough segments, add remaining time
-            if segment_durations:
-                total_segments_duration = sum(segment_durations)
-                if total_segments_duration < audio_duration:
-                    # Add one more segment
-                    remaining = audio_duration - total_segments_duration
-                    if remaining > config.MIN_SEGMENT_DURATION:
-                        segment_durations.append(remaining)
-            else:
-                # No valid segments, use entire video
-                segment_durations = [min(audio_duration, video_duration)]
-            
-            # Generate segments
-            segments = []
-            current_video_time = 0.0
-            
-            for i, seg_duration in enumerate(segment_durations):
-                # Ensure we don't exceed video duration
-                if current_video_time + seg_duration > video_duration:
-                    # Loop back to start
-                    current_video_time = 0.0
-                
-                # Extract segment
-                segment_path = self.extract_segment(
-                    video_path,
-                    current_video_time,
-                    seg_duration,
-                    output_path=str(self.temp_dir / f"segment_{i:04d}.mp4")
-                )
+            plan = self._plan_segments(video_duration, timestamps, audio_duration, order)
+            segment_durations = [seg_duration for _, seg_duration in plan]
+            
+            # A single segment starts at 0 and, if it lasts as long as the
+            # result can, is just the source - merge_segments_with_audio
+            # trims it to the audio, so don't cut a copy first. The merge
+            # copies the video stream, so only for H.264 sources (like
+            # _copy_segment); anything else is extracted to H.264 as usual
+            if (
+                len(segment_durations) == 1
+                and segment_durations[0] >= min(audio_duration, video_duration)
+            ):
+                info = get_video_info(video_path)
+                if info and info['video_codec'] == 'h264':
+                    return [video_path]
+            
+            # Unique names, so concurrent jobs can share temp_dir
+            prefix = f"segment_{uuid.uuid4().hex[:8]}_"
+            
+            # Back-to-back cuts that fit in the video: one FFmpeg run
+            if order == 'sequential' and sum(segment_durations) <= video_duration:
+                segments = self._split_sequential(video_path, segment_durations, prefix)
+                if segments:
+                    return segments
+            
+            # Segment jobs (start, duration, output path)
+            extension = SEGMENT_EXTENSIONS[SEGMENT_CONTAINER]
+            jobs = [
+                (start_time, seg_duration, str(self.temp_dir / f"{prefix}{i:04d}{extension}"))
+                for i, (start_time, seg_duration) in enumerate(plan)
+            ]
+            
+            # Extract segments in parallel - each is its own FFmpeg process
+            max_workers = max(1, min(self.max_processes, len(jobs)))
+            
+            # Copied and encoded segments carry different SPS/PPS, and the
+            # merge copies the video stream - so copy all of them or none
+            if all(self._copy_start(video_path, start_time) is not None for start_time, _ in plan):
+                def copy(job: Tuple[float, float, str]) -> bool:
+                    start_time, seg_duration, output_path = job
+                    return self._copy_segment(
+                        video_path, start_time, seg_duration, output_path,
+                        container=SEGMENT_CONTAINER
+                    )
                 
-                if segment_path:
-                    segments.append(segment_path)
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    copied = list(executor.map(copy, jobs))
                 
-                # Move to next position
-                if order == 'sequential':
-                    current_video_time += seg_duration
-                else:  # random
-                    # Pick random position in video
-                    max_start = max(0, video_duration - seg_duration)
-                    current_video_time = random.uniform(0, max_start)
+                if all(copied):
+                    return [output_path for _, _, output_path in jobs]
             
-            return segments
+            def extract(job: Tuple[float, float, str]) -> Optional[str]:
+                start_time, seg_duration, output_path = job
+                return self.extract_segment(
+                    video_path, start_time, seg_duration, output_path,
+                    container=SEGMENT_CONTAINER, allow_copy=False
+                )
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(extract, jobs))
+            
+            return [segment_path for segment_path in results if segment_path]
         
         except Exception as e:
             if config.DEBUG:
@@ -187,100 +547,298 @@ class VideoCutter:
             if not segment_paths:
                 return None
             
-            # Create concat file
-            concat_file = self.temp_dir / "segments_concat.txt"
+            concat_file = self.temp_dir / f"segments_concat_{uuid.uuid4().hex[:8]}.txt"
             
-            with open(concat_file, 'w') as f:
-                for segment_path in segment_paths:
-                    abs_path = os.path.abspath(segment_path)
-                    f.write(f"file '{abs_path}'\n")
-            
-            # First, concatenate video segments without audio
-            temp_video = str(self.temp_dir / "temp_concat.mp4")
-            
-            cmd_concat = [
-                'ffmpeg',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', str(concat_file),
-                '-c', 'copy',
+            if len(segment_paths) == 1:
+                # Nothing to join - read the segment directly
+                video_input = ['-i', segment_paths[0]]
+            else:
+                # Create concat file (paths made absolute against one
+                # getcwd, not one per segment)
+                # Whole list built in memory and written at once
+                cwd = os.getcwd()
+                concat_file.write_text(''.join(
+                    f"file '{os.path.join(cwd, segment_path)}'\n"
+                    for segment_path in segment_paths
+                ))
+                video_input = ['-f', 'concat', '-safe', '0', '-i', str(concat_file)]
+            
+            # Audio slice, muxed in the same run as the video
+            audio_duration = audio_end - audio_start
+            audio_input = [
+                '-ss', str(audio_start),
+                '-t', str(audio_duration),
+                '-i', audio_path,
+            ]
+            output_args = [
+                '-c:a', config.AUDIO_CODEC,
+                '-b:a', config.AUDIO_BITRATE,
+                '-shortest',
+                '-movflags', 'faststart',
                 '-y',
-                temp_video
+                output_path
             ]
             
-            result = subprocess.run(cmd_concat, capture_output=True, text=True)
-            
-            if result.returncode != 0 or not os.path.exists(temp_video):
-                # Try with re-encoding
-                cmd_concat = [
-                    'ffmpeg',
-                    '-f', 'concat',
-                    '-safe', '0',
-                    '-i', str(concat_file),
-                    '-c:v', config.VIDEO_CODEC,
-                    '-preset', config.VIDEO_PRESET,
-                    '-crf', str(config.VIDEO_CRF),
-                    '-y',
-                    temp_video
+            # Concatenate video segments without re-encoding and add audio
+            cmd_merge = [
+                *video_input,
+                *audio_input,
+                '-map', '0:v:0',
+                '-map', '1:a:0',
+                '-c:v', 'copy',
+                *output_args
+            ]
+            
+            success = self._run_ffmpeg(cmd_merge)
+            
+            if not success:
+                # Try with re-encoding (concat filter handles segments whose
+                # streams don't line up for a copy)
+                segment_inputs = []
+                for segment_path in segment_paths:
+                    segment_inputs += ['-i', segment_path]
+                
+                n = len(segment_paths)
+                video_pads = ''.join(f"[{i}:v:0]" for i in range(n))
+                
+                cmd_merge = [
+                    *segment_inputs,
+                    *audio_input,
+                    '-filter_complex', f"{video_pads}concat=n={n}:v=1:a=0[v]",
+                    '-map', '[v]',
+                    '-map', f"{n}:a:0",
+                    *get_video_encoder_args(),
+                    *output_args
                 ]
                 
-                result = subprocess.run(cmd_concat, capture_output=True, text=True)
+                success = self._run_ffmpeg(cmd_merge)
+            
+            # Cleanup
+            concat_file.unlink(missing_ok=True)
+            
+            if success:
+                return output_path
+            
+            return None
+        
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error merging segments with audio: {str(e)}")
+            return None
+    
+    def cut_and_merge(
+        self,
+        video_path: str,
+        timestamps: List[float],
+        audio_path: str,
+        audio_start: float,
+        audio_end: float,
+        output_path: str,
+        order: str = 'sequential'
+    ) -> Optional[str]:
+        """
+        Cut segments and merge them with audio into the final video
+        
+        With NVENC the whole job runs on the GPU in one FFmpeg run (see
+        cut_and_merge_gpu); otherwise segments are cut to temp files,
+        merged, and deleted.
+        
+        Args:
+            video_path: Input video path
+            timestamps: List of cut points in seconds
+            audio_path: Path to audio file
+            audio_start: Audio start time
+            audio_end: Audio end time
+            output_path: Output file path
+            order: 'sequential' or 'random'
+            
+        Returns:
+            Path to output video or None
+        """
+        audio_duration = audio_end - audio_start
+        
+        if self.hw_encoder == 'h264_nvenc':
+            probe = probe_file(video_path)
+            if probe:
+                video_duration = float(probe['format']['duration'])
+                plan = self._plan_segments(video_duration, timestamps, audio_duration, order)
                 
-                if result.returncode != 0:
-                    return None
+                # A single segment is a plain remux on the CPU path
+                if 1 < len(plan) <= GPU_MAX_SEGMENTS:
+                    result = self.cut_and_merge_gpu(
+                        video_path, plan, audio_path, audio_start, audio_end, output_path
+                    )
+                    if result:
+                        return result
+        
+        segments = self.create_segments_from_timestamps(
+            video_path, timestamps, audio_duration, order
+        )
+        
+        try:
+            return self.merge_segments_with_audio(
+                segments, audio_path, audio_start, audio_end, output_path
+            )
+        finally:
+            self.cleanup_segments(segments)
+    
+    def cut_and_merge_batch(
+        self,
+        jobs: List[Dict],
+        max_workers: Optional[int] = None
+    ) -> List[Optional[str]]:
+        """
+        Generate several reels concurrently
+        
+        Jobs overlap (one reel's merge runs while another is being cut);
+        the FFmpeg processes they start share this cutter's process cap.
+        
+        Args:
+            jobs: List of dicts of cut_and_merge() keyword arguments
+                  (video_path, timestamps, audio_path, audio_start, ...)
+            max_workers: Reels in flight at once (defaults to the process cap)
             
-            # Now add audio
-            audio_duration = audio_end - audio_start
+        Returns:
+            List of output paths (None for failed jobs), in job order
+        """
+        if not jobs:
+            return []
+        
+        if max_workers is None:
+            max_workers = self.max_processes
+        max_workers = max(1, min(max_workers, len(jobs)))
+        
+        if max_workers == 1:
+            return [self.cut_and_merge(**job) for job in jobs]
+        
+        # Threads are enough here: each worker just waits on its ffmpeg
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.cut_and_merge, **job) for job in jobs]
+            return [future.result() for future in futures]
+    
+    def cut_and_merge_gpu(
+        self,
+        video_path: str,
+        plan: List[Tuple[float, float]],
+        audio_path: str,
+        audio_start: float,
+        audio_end: float,
+        output_path: str
+    ) -> Optional[str]:
+        """
+        Cut, concatenate and encode in one FFmpeg run, frames kept on the GPU
+        
+        Each segment is its own NVDEC-decoded input (-ss/-t), the concat
+        filter joins the CUDA frames and NVENC encodes them - no temp
+        files and no copies through host memory.
+        
+        Args:
+            video_path: Input video path
+            plan: List of (start, duration) tuples (see _plan_segments)
+            audio_path: Path to audio file
+            audio_start: Audio start time
+            audio_end: Audio end time
+            output_path: Output file path
+            
+        Returns:
+            Path to output video or None
+        """
+        try:
+            segment_inputs = []
+            for start_time, seg_duration in plan:
+                segment_inputs += [
+                    '-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda',
+                    '-ss', str(start_time),
+                    '-t', str(seg_duration),
+                    '-i', video_path,
+                ]
+            
+            n = len(plan)
+            video_pads = ''.join(f"[{i}:v:0]" for i in range(n))
             
-            cmd_audio = [
-                'ffmpeg',
-                '-i', temp_video,
+            cmd = [
+                *segment_inputs,
                 '-ss', str(audio_start),
-                '-t', str(audio_duration),
+                '-t', str(audio_end - audio_start),
                 '-i', audio_path,
-                '-c:v', 'copy',
+                '-filter_complex', f"{video_pads}concat=n={n}:v=1:a=0[v]",
+                '-map', '[v]',
+                '-map', f"{n}:a:0",
+                *get_video_encoder_args(),
                 '-c:a', config.AUDIO_CODEC,
                 '-b:a', config.AUDIO_BITRATE,
-                '-map', '0:v:0',
-                '-map', '1:a:0',
                 '-shortest',
                 '-movflags', 'faststart',
                 '-y',
                 output_path
             ]
             
-            result = subprocess.run(cmd_audio, capture_output=True, text=True)
-            
-            # Cleanup
-            if concat_file.exists():
-                concat_file.unlink()
-            if os.path.exists(temp_video):
-                os.unlink(temp_video)
-            
-            if result.returncode == 0 and os.path.exists(output_path):
+            if self._run_ffmpeg(cmd):
                 return output_path
             
             return None
         
         except Exception as e:
             if config.DEBUG:
-                print(f"Error merging segments with audio: {str(e)}")
+                print(f"Error in GPU cut and merge: {str(e)}")
             return None
     
     def cleanup_segments(self, segment_paths: List[str]) -> None:
         """
         Clean up temporary segment files
         
+        Only files in temp_dir are deleted - a single-segment cut returns
+        the source video itself.
+        
         Args:
             segment_paths: List of segment paths to delete
         """
+        cwd = os.getcwd()
+        temp_dir = os.path.normpath(os.path.join(cwd, self.temp_dir))
+        
         for segment_path in segment_paths:
+            if os.path.dirname(os.path.normpath(os.path.join(cwd, segment_path))) != temp_dir:
+                continue
             try:
-                if os.path.exists(segment_path):
-                    os.unlink(segment_path)
-            except Exception as e:
+                os.unlink(segment_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
                 if config.DEBUG:
                     print(f"Could not delete {segment_path}: {str(e)}")
+    
+    def cleanup_all(self) -> None:
+        """Delete every segment_* file left in temp_dir, in one directory scan"""
+        extensions = tuple(SEGMENT_EXTENSIONS.values())
+        
+        with os.scandir(self.temp_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith('segment_') and entry.name.endswith(extensions)):
+                    continue
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    if config.DEBUG:
+                        print(f"Could not delete {entry.path}: {str(e)}")
+
+
+# ============================================================================
+# MODULE-LEVEL CONVENIENCE FUNCTIONS
+# ============================================================================
+
+# Shared instance for the module-level functions (constructing one creates
+# temp_dir and detects the hardware encoder)
+_DEFAULT_CUTTER: Optional[VideoCutter] = None
+
+
+def _cutter() -> VideoCutter:
+    """Get the shared VideoCutter, creating it on first use"""
+    global _DEFAULT_CUTTER
+    if _DEFAULT_CUTTER is None:
+        _DEFAULT_CUTTER = VideoCutter()
+    return _DEFAULT_CUTTER
 
 
 def create_segments(
@@ -301,7 +859,7 @@ def create_segments(
     Returns:
         List of segment file paths
     """
-    cutter = VideoCutter()
+    cutter = _cutter()
     return cutter.create_segments_from_timestamps(
         video_path,
         cut_points,
@@ -330,7 +888,7 @@ def merge_with_audio(
     Returns:
         Path to final video or None
     """
-    cutter = VideoCutter()
+    cutter = _cutter()
     return cutter.merge_segments_with_audio(
         segments,
         audio_path,
@@ -340,6 +898,60 @@ def merge_with_audio(
     )
 
 
+def cut_and_merge(
+    video_path: str,
+    cut_points: List[float],
+    order: str,
+    audio_path: str,
+    audio_start: float,
+    audio_end: float,
+    output_path: str
+) -> Optional[str]:
+    """
+    Cut video at cut points and merge with audio (GPU-only with NVENC)
+    
+    Args:
+        video_path: Input video path
+        cut_points: List of timestamps to cut at
+        order: 'sequential' or 'random'
+        audio_path: Path to audio file
+        audio_start: Audio start time in seconds
+        audio_end: Audio end time in seconds
+        output_path: Output file path
+        
+    Returns:
+        Path to final video or None
+    """
+    cutter = _cutter()
+    return cutter.cut_and_merge(
+        video_path,
+        cut_points,
+        audio_path,
+        audio_start,
+        audio_end,
+        output_path,
+        order
+    )
+
+
+def cut_and_merge_batch(
+    jobs: List[Dict],
+    max_workers: Optional[int] = None
+) -> List[Optional[str]]:
+    """
+    Generate several reels concurrently
+    
+    Args:
+        jobs: List of dicts of VideoCutter.cut_and_merge() keyword arguments
+        max_workers: Reels in flight at once
+        
+    Returns:
+        List of output paths (None for failed jobs), in job order
+    """
+    cutter = _cutter()
+    return cutter.cut_and_merge_batch(jobs, max_workers=max_workers)
+
+
 def extract_segment(
     video_path: str,
     start_time: float,
@@ -358,7 +970,7 @@ def extract_segment(
     Returns:
         Path to extracted segment or None
     """
-    cutter = VideoCutter()
+    cutter = _cutter()
     return cutter.extract_segment(video_path, start_time, duration, output_path)
 
 
@@ -369,5 +981,11 @@ def cleanup_temp_segments(segment_paths: List[str]) -> None:
     Args:
         segment_paths: List of segment paths to delete
     """
-    cutter = VideoCutter()
-    cutter.cleanup_segments(segment_paths)
\ No newline at end of file
+    cutter = _cutter()
+    cutter.cleanup_segments(segment_paths)
+
+
+def cleanup_all_segments() -> None:
+    """Delete all temporary segment files in the temp directory"""
+    cutter = _cutter()
+    cutter.cleanup_all()
@@ -3,14 +3,546 @@ FFmpeg Helper - Utility functions for FFmpeg operations
 Provides wrappers for common FFmpeg tasks
 """
 
+import asyncio
 import os
+import shutil
+import sqlite3
 import subprocess
 import json
-from pathlib import Path
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Optional, Tuple, List
-import ffmpeg
 
 import config
+from .mp4_probe import probe_mp4
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - probe output parses with json
+    orjson = None
+
+
+# Keeps ffmpeg's stderr down to actual errors - no banner, no per-frame stats
+QUIET_ARGS = ['-hide_banner', '-loglevel', 'error', '-nostats']
+
+# Audio codecs each output container can take as a stream copy
+AUDIO_COPY_CODECS = {
+    'm4a': {'aac', 'alac', 'mp3'},
+    'mp4': {'aac', 'alac', 'mp3', 'opus'},
+    'aac': {'aac'},
+    'mp3': {'mp3'},
+    'opus': {'opus'},
+    'ogg': {'opus', 'vorbis', 'flac'},
+    'flac': {'flac'},
+    'wav': {'pcm_s16le', 'pcm_s24le', 'pcm_f32le'},
+}
+
+# Encoders for containers that can't hold config.AUDIO_CODEC
+AUDIO_FORMAT_ENCODERS = {
+    'mp3': 'libmp3lame',
+    'wav': 'pcm_s16le',
+    'flac': 'flac',
+    'opus': 'libopus',
+    'ogg': 'libopus',
+}
+
+# Hardware H.264 encoders, in order of preference
+HW_ENCODERS = {
+    'nvenc': 'h264_nvenc',
+    'qsv': 'h264_qsv',
+    'amf': 'h264_amf',
+    'videotoolbox': 'h264_videotoolbox',
+}
+
+
+@lru_cache(maxsize=None)
+def _encoder_works(encoder: str) -> bool:
+    """Check that an encoder is compiled in and usable on this machine"""
+    try:
+        result = subprocess.run(
+            [
+                'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                '-f', 'lavfi', '-i', 'color=black:size=256x256:duration=0.1',
+                '-frames:v', '1',
+                '-c:v', encoder,
+                '-f', 'null', '-'
+            ],
+            capture_output=True,
+            timeout=15
+        )
+        return result.returncode == 0
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return False
+
+
+@lru_cache(maxsize=1)
+def _available_encoders() -> str:
+    """Output of `ffmpeg -encoders`, read once per process"""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-encoders'],
+            capture_output=True,
+            text=True
+        )
+        return result.stdout
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return ''
+
+
+@lru_cache(maxsize=1)
+def _available_filters() -> frozenset:
+    """Filter names from `ffmpeg -filters`, read once per process"""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-filters'],
+            capture_output=True,
+            text=True
+        )
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return frozenset()
+    
+    # Lines look like " T.. overlay_cuda      VV->V      Overlay one ..."
+    return frozenset(
+        fields[1] for fields in map(str.split, result.stdout.splitlines())
+        if len(fields) >= 3 and '->' in fields[2]
+    )
+
+
+# Persistent probe cache (config.PROBE_CACHE_PATH); one connection shared
+# by all threads, serialized by the lock. False = unavailable
+_PROBE_DB: Optional[sqlite3.Connection] = None
+_PROBE_DB_LOCK = threading.Lock()
+_PROBE_DB_VERSION = 3
+
+
+def _probe_db() -> Optional[sqlite3.Connection]:
+    """Open the persistent probe cache on first use (caller holds the lock)"""
+    global _PROBE_DB
+    if _PROBE_DB is None:
+        _PROBE_DB = False
+        if config.PROBE_CACHE_PATH:
+            try:
+                db = sqlite3.connect(str(config.PROBE_CACHE_PATH), check_same_thread=False)
+                # Cached results are disposable - rebuild on a schema change
+                if db.execute('PRAGMA user_version').fetchone()[0] != _PROBE_DB_VERSION:
+                    db.execute('DROP TABLE IF EXISTS probe')
+                    db.execute(f'PRAGMA user_version = {_PROBE_DB_VERSION}')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS probe ('
+                    'path TEXT, size INTEGER, mtime_ns INTEGER, streams TEXT, '
+                    'json TEXT, used REAL, '
+                    'PRIMARY KEY (path, size, mtime_ns, streams))'
+                )
+                # Trim to the size cap once per process, least recently used first
+                db.execute(
+                    'DELETE FROM probe WHERE rowid IN ('
+                    'SELECT rowid FROM probe ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                    (config.PROBE_CACHE_MAX_ENTRIES,)
+                )
+                db.commit()
+                _PROBE_DB = db
+            except sqlite3.Error as e:
+                if config.DEBUG:
+                    print(f"Probe cache unavailable: {str(e)}")
+    return _PROBE_DB or None
+
+
+def _probe_db_get(file_path: str, mtime_ns: int, size: int, streams: str) -> Optional[Dict]:
+    """Probe result from the persistent cache, or None"""
+    with _PROBE_DB_LOCK:
+        db = _probe_db()
+        if db is None:
+            return None
+        key = (file_path, size, mtime_ns, streams)
+        try:
+            row = db.execute(
+                'SELECT json FROM probe '
+                'WHERE path = ? AND size = ? AND mtime_ns = ? AND streams = ?',
+                key
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                'UPDATE probe SET used = ? '
+                'WHERE path = ? AND size = ? AND mtime_ns = ? AND streams = ?',
+                (time.time(),) + key
+            )
+            db.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError):
+            return None
+
+
+def _probe_db_put(file_path: str, mtime_ns: int, size: int, streams: str, probe: Dict) -> None:
+    """Store a probe result in the persistent cache"""
+    with _PROBE_DB_LOCK:
+        db = _probe_db()
+        if db is None:
+            return
+        try:
+            # Older versions of the file are stale for good
+            db.execute(
+                'DELETE FROM probe WHERE path = ? AND (size != ? OR mtime_ns != ?)',
+                (file_path, size, mtime_ns)
+            )
+            db.execute(
+                'INSERT OR REPLACE INTO probe (path, size, mtime_ns, streams, json, used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (file_path, size, mtime_ns, streams, json.dumps(probe), time.time())
+            )
+            db.commit()
+        except sqlite3.Error as e:
+            if config.DEBUG:
+                print(f"Could not store probe result: {str(e)}")
+
+
+# The only probe fields anything in the project reads; asking ffprobe for
+# just these keeps its JSON (tags, dispositions, side data) several times
+# smaller and quicker to parse
+PROBE_ENTRIES = (
+    'stream=index,codec_type,codec_name,width,height,pix_fmt,r_frame_rate,'
+    'bit_rate,sample_rate,channels'
+    ':format=duration,size,bit_rate'
+)
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Metadata only needs the container header and the first packets; the
+# defaults (5 MB / 5 s) make ffprobe read far more than that on big files.
+# Probes that come back incomplete are retried with the defaults
+PROBE_QUICK_ARGS = ['-probesize', '1000000', '-analyzeduration', '1000000']
+
+
+def _run_ffprobe(file_path: str, probe_args: List[str]) -> Dict:
+    """One ffprobe run over PROBE_ENTRIES"""
+    result = subprocess.run(
+        [
+            'ffprobe', '-v', 'error',
+            *probe_args,
+            '-print_format', 'json',
+            '-show_entries', PROBE_ENTRIES,
+            file_path
+        ],
+        capture_output=True,
+        check=True
+    )
+    return _json_loads(result.stdout)
+
+
+def _probe_complete(probe: Dict) -> bool:
+    """Whether a quick probe found everything the full one would"""
+    if 'duration' not in probe.get('format', {}):
+        return False
+    
+    for stream in probe.get('streams', []):
+        codec_type = stream.get('codec_type')
+        if codec_type == 'video' and not (stream.get('width') and stream.get('pix_fmt')):
+            return False
+        if codec_type == 'audio' and not stream.get('sample_rate'):
+            return False
+    return bool(probe.get('streams'))
+
+
+@lru_cache(maxsize=1024)
+def _probe_cached(file_path: str, mtime_ns: int, size: int, streams: str = '') -> Dict:
+    """
+    ffprobe result for a file version (shared - treat as read-only)
+    
+    mtime_ns and size are part of the key so a rewritten file is re-probed.
+    streams is an ffprobe stream specifier ('a:0' etc.) limiting which
+    streams are reported; empty for all of them.
+    Backed by the persistent cache, so unchanged files aren't re-probed
+    across runs either. Calls ffprobe directly, limited to PROBE_ENTRIES,
+    so importing this module doesn't load ffmpeg-python.
+    """
+    # MP4/MOV metadata sits in the moov box - reading it in-process is
+    # much cheaper than starting ffprobe (or even the sqlite lookup)
+    probe = probe_mp4(file_path, streams)
+    if probe is not None:
+        return probe
+    
+    probe = _probe_db_get(file_path, mtime_ns, size, streams)
+    if probe is not None:
+        return probe
+    
+    select_args = ['-select_streams', streams] if streams else []
+    try:
+        probe = _run_ffprobe(file_path, PROBE_QUICK_ARGS + select_args)
+    except subprocess.CalledProcessError:
+        probe = None
+    
+    if probe is None or not _probe_complete(probe):
+        probe = _run_ffprobe(file_path, select_args)
+    
+    _probe_db_put(file_path, mtime_ns, size, streams, probe)
+    return probe
+
+
+def _file_key(file_path: str) -> Optional[Tuple[str, int, int]]:
+    """Cache key for a file version: (absolute path, mtime_ns, size), None if missing"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    
+    return os.path.abspath(file_path), st.st_mtime_ns, st.st_size
+
+
+class _FFmpegPool:
+    """Bounds concurrent ffmpeg runs so their threads don't oversubscribe the CPU"""
+    
+    def __init__(self, max_concurrent: int, threads_per_process: Optional[int] = None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.threads = threads_per_process or max(1, config.FFMPEG_THREADS // self.max_concurrent)
+        self.slots = threading.BoundedSemaphore(self.max_concurrent)
+
+
+_POOL = _FFmpegPool(config.FFMPEG_MAX_CONCURRENT)
+
+
+def _temp_output_path(source_path: str, suffix: str) -> str:
+    """Default output path in TEMP_DIR: source file stem + suffix"""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(config.TEMP_DIR, stem + suffix)
+
+
+@lru_cache(maxsize=128)
+def _parse_fps(rate: str) -> float:
+    """Frame rate from an ffprobe rational like '30000/1001' (30.0 if unusable)"""
+    num, sep, den = rate.partition('/')
+    try:
+        return int(num) / int(den) if sep else float(rate)
+    except (ValueError, ZeroDivisionError):
+        return 30.0
+
+
+@lru_cache(maxsize=1024)
+def _video_info_cached(file_path: str, mtime_ns: int, size: int) -> Optional[Dict]:
+    """get_video_info result for a file version (shared - treat as read-only)"""
+    probe = _probe_cached(file_path, mtime_ns, size)
+    
+    # Find video stream
+    video_stream = next(
+        (stream for stream in probe['streams'] if stream['codec_type'] == 'video'),
+        None
+    )
+    
+    # Find audio stream
+    audio_stream = next(
+        (stream for stream in probe['streams'] if stream['codec_type'] == 'audio'),
+        None
+    )
+    
+    if not video_stream:
+        return None
+    
+    # Extract video info
+    width = int(video_stream.get('width', 0))
+    height = int(video_stream.get('height', 0))
+    
+    # Get fps
+    fps = _parse_fps(video_stream.get('r_frame_rate', '30/1'))
+    
+    # Get duration
+    duration = float(probe['format'].get('duration', 0))
+    
+    # Get codecs
+    video_codec = video_stream.get('codec_name', 'unknown')
+    audio_codec = audio_stream.get('codec_name', 'none') if audio_stream else 'none'
+    
+    # Get bitrates
+    video_bitrate = video_stream.get('bit_rate', '0')
+    audio_bitrate = audio_stream.get('bit_rate', '0') if audio_stream else '0'
+    
+    # Get file size
+    file_size = int(probe['format'].get('size', 0))
+    
+    return {
+        'width': width,
+        'height': height,
+        'fps': fps,
+        'duration': duration,
+        'video_codec': video_codec,
+        'pix_fmt': video_stream.get('pix_fmt'),
+        'audio_codec': audio_codec,
+        'video_bitrate': video_bitrate,
+        'audio_bitrate': audio_bitrate,
+        'file_size': file_size,
+        'aspect_ratio': width / height if height > 0 else 0,
+        'has_audio': audio_stream is not None,
+    }
+
+
+@lru_cache(maxsize=1024)
+def _audio_info_cached(file_path: str, mtime_ns: int, size: int) -> Optional[Dict]:
+    """get_audio_info result for a file version (shared - treat as read-only)"""
+    # Only the first audio stream is reported - no scan over cover art,
+    # subtitles or the video stream of a music video
+    probe = _probe_cached(file_path, mtime_ns, size, 'a:0')
+    
+    if not probe.get('streams'):
+        return None
+    audio_stream = probe['streams'][0]
+    
+    # Extract audio info
+    duration = float(probe['format'].get('duration', 0))
+    codec = audio_stream.get('codec_name', 'unknown')
+    bitrate = audio_stream.get('bit_rate', '0')
+    sample_rate = int(audio_stream.get('sample_rate', 0))
+    channels = int(audio_stream.get('channels', 0))
+    
+    return {
+        'duration': duration,
+        'codec': codec,
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'file_size': int(probe['format'].get('size', 0)),
+    }
+
+
+@lru_cache(maxsize=1024)
+def _probe_minimal(file_path: str, mtime_ns: int, size: int) -> Tuple[float, bool]:
+    """
+    (duration, has audio) for a file version
+    
+    The two facts reel assembly asks for most. Read straight off the shared
+    probe - no second ffprobe run and none of get_video_info's parsing.
+    """
+    probe = _probe_cached(file_path, mtime_ns, size)
+    
+    # Same answers as get_video_info: nothing for files without video
+    codec_types = {stream['codec_type'] for stream in probe['streams']}
+    if 'video' not in codec_types:
+        return 0.0, False
+    
+    duration = float(probe['format'].get('duration', 0))
+    return duration, 'audio' in codec_types
+
+
+def _shared_video_info(video_path: str) -> Optional[Dict]:
+    """
+    Cached video info without the defensive copy (read-only)
+    
+    For the single-field accessors, which only read one key.
+    """
+    try:
+        key = _file_key(video_path)
+        return _video_info_cached(*key) if key else None
+    except Exception as e:
+        if config.DEBUG:
+            print(f"Error getting video info: {str(e)}")
+        return None
+
+
+def _shared_audio_info(audio_path: str) -> Optional[Dict]:
+    """Cached audio info without the defensive copy (read-only)"""
+    try:
+        key = _file_key(audio_path)
+        return _audio_info_cached(*key) if key else None
+    except Exception as e:
+        if config.DEBUG:
+            print(f"Error getting audio info: {str(e)}")
+        return None
+
+
+@lru_cache(maxsize=256)
+def _keyframes_cached(file_path: str, mtime_ns: int, size: int) -> Tuple[float, ...]:
+    """
+    Keyframe timestamps of the first video stream, in seconds
+    
+    Relative to the file's start_time (what -ss/-to measure from), not raw
+    packet pts - MPEG-TS and B-frame delayed files don't start at 0.
+    Reads packet flags only, so nothing is decoded.
+    """
+    result = subprocess.run(
+        [
+            'ffprobe', '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags:format=start_time',
+            # Section name first, so packet and format lines can be told apart
+            '-of', 'csv=p=1',
+            file_path
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    
+    times = []
+    start_time = 0.0
+    for line in result.stdout.splitlines():
+        section, _, fields = line.partition(',')
+        if section == 'packet':
+            pts_time, _, flags = fields.partition(',')
+            if 'K' in flags and pts_time not in ('', 'N/A'):
+                times.append(float(pts_time))
+        elif section == 'format' and fields not in ('', 'N/A'):
+            start_time = float(fields)
+    
+    return tuple(sorted(t - start_time for t in times))
+
+
+@lru_cache(maxsize=256)
+def _parameter_sets_cached(file_path: str, mtime_ns: int, size: int) -> Tuple[bytes, ...]:
+    """
+    SPS and PPS NAL units of the first H.264 video stream
+    
+    Copies one frame out as Annex B (ffmpeg puts the parameter sets in
+    front of it), so nothing is decoded.
+    """
+    result = subprocess.run(
+        [
+            'ffmpeg', '-hide_banner', '-nostdin', '-loglevel', 'error',
+            '-i', file_path,
+            '-map', '0:v:0', '-c', 'copy', '-frames:v', '1',
+            '-f', 'h264', 'pipe:1'
+        ],
+        capture_output=True,
+        check=True
+    )
+    
+    nals = []
+    for nal in result.stdout.split(b'\x00\x00\x01'):
+        # A 4-byte start code leaves its leading zero on the previous NAL
+        nal = nal.rstrip(b'\x00')
+        if nal and nal[0] & 0x1F in (7, 8) and nal not in nals:
+            nals.append(nal)
+    
+    return tuple(nals)
+
+
+@lru_cache(maxsize=1)
+def _ffmpeg_path() -> Optional[str]:
+    """Location of the ffmpeg binary, looked up once per process"""
+    # A PATH lookup - no need to start ffmpeg just to see that it exists
+    return shutil.which('ffmpeg')
+
+
+@lru_cache(maxsize=1)
+def _ffmpeg_version() -> Optional[str]:
+    """Version from `ffmpeg -version`, read once per process"""
+    if _ffmpeg_path() is None:
+        return None
+    
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-version'],
+            capture_output=True,
+            text=True
+        )
+    except (subprocess.SubprocessError, OSError):
+        return None
+    
+    if result.returncode != 0:
+        return None
+    
+    # First line looks like "ffmpeg version 6.1.1 Copyright ..."
+    fields = result.stdout.split('\n')[0].split(' ')
+    return fields[2] if len(fields) > 2 else 'unknown'
 
 
 class FFmpegHelper:
@@ -24,16 +556,7 @@ class FFmpegHelper:
         Returns:
             True if FFmpeg is installed, False otherwise
         """
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-version'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.returncode == 0
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return _ffmpeg_path() is not None
     
     @staticmethod
     def get_version() -> Optional[str]:
@@ -43,46 +566,102 @@ class FFmpegHelper:
         Returns:
             Version string or None
         """
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-version'],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                # Parse version from first line
-                first_line = result.stdout.split('\n')[0]
-                version = first_line.split(' ')[2] if len(first_line.split(' ')) > 2 else 'unknown'
-                return version
-            
-            return None
-        except Exception:
-            return None
+        return _ffmpeg_version()
+    
+    @staticmethod
+    def configure_pool(max_concurrent: int, threads_per_process: Optional[int] = None) -> None:
+        """
+        Resize the pool limiting concurrent conversion/extraction/thumbnail runs
+        
+        Runs already waiting keep the old limit; later ones use the new one.
+        
+        Args:
+            max_concurrent: Maximum ffmpeg processes at once
+            threads_per_process: Threads per ffmpeg (default: an equal share
+                of config.FFMPEG_THREADS)
+        """
+        global _POOL
+        _POOL = _FFmpegPool(max_concurrent, threads_per_process)
     
     @staticmethod
-    def probe_file(file_path: str) -> Optional[Dict]:
+    def probe_file(file_path: str, select_streams: Optional[str] = None) -> Optional[Dict]:
         """
-        Probe media file using ffprobe
+        Probe media file using ffprobe (cached per path, mtime and size)
         
         Args:
             file_path: Path to media file
+            select_streams: ffprobe stream specifier ('v:0', 'a:0', ...) to
+                report only matching streams; None for all of them
             
         Returns:
             Dict with file information or None
         """
         try:
-            if not os.path.exists(file_path):
+            key = _file_key(file_path)
+            if not key:
                 return None
             
-            probe = ffmpeg.probe(file_path)
-            return probe
+            return _probe_cached(*key, select_streams or '')
         
         except Exception as e:
             if config.DEBUG:
                 print(f"Error probing file: {str(e)}")
             return None
     
+    @staticmethod
+    def probe_files(file_paths: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Probe many files concurrently
+        
+        ffprobe takes one input per run, but the runs are independent and
+        mostly wait on IO, so they overlap well. Results land in the probe
+        cache, so later per-file lookups are free.
+        
+        Args:
+            file_paths: Paths to media files (duplicates are probed once)
+            
+        Returns:
+            Dict mapping each path to its probe result (None on failure)
+        """
+        unique_paths = list(dict.fromkeys(file_paths))
+        if len(unique_paths) <= 1:
+            return {path: FFmpegHelper.probe_file(path) for path in unique_paths}
+        
+        max_workers = min(16, os.cpu_count() or 4, len(unique_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(unique_paths, executor.map(FFmpegHelper.probe_file, unique_paths)))
+    
+    @staticmethod
+    def clear_probe_caches(file_path: str) -> None:
+        """
+        Clear all in-memory probe caches and a file's persisted results
+        
+        The in-memory (lru) caches can't drop single entries, so every
+        file's results are cleared from them; only file_path's rows are
+        removed from the on-disk cache. Only needed when a file is rewritten
+        with the same size within the filesystem's mtime resolution; other
+        rewrites change the cache key.
+        
+        Args:
+            file_path: Path to the media file whose persisted results to drop
+        """
+        for cached in (
+            _probe_cached, _probe_minimal, _video_info_cached,
+            _audio_info_cached, _keyframes_cached, _parameter_sets_cached
+        ):
+            cached.cache_clear()
+        
+        with _PROBE_DB_LOCK:
+            db = _probe_db()
+            if db is None:
+                return
+            try:
+                db.execute('DELETE FROM probe WHERE path = ?', (os.path.abspath(file_path),))
+                db.commit()
+            except sqlite3.Error as e:
+                if config.DEBUG:
+                    print(f"Could not clear probe cache: {str(e)}")
+    
     @staticmethod
     def get_video_info(video_path: str) -> Optional[Dict]:
         """
@@ -95,62 +674,13 @@ class FFmpegHelper:
             Dict with video info or None
         """
         try:
-            probe = FFmpegHelper.probe_file(video_path)
-            
-            if not probe:
-                return None
-            
-            # Find video stream
-            video_stream = next(
-                (stream for stream in probe['streams'] if stream['codec_type'] == 'video'),
-                None
-            )
-            
-            # Find audio stream
-            audio_stream = next(
-                (stream for stream in probe['streams'] if stream['codec_type'] == 'audio'),
-                None
-            )
-            
-            if not video_stream:
+            key = _file_key(video_path)
+            if not key:
                 return None
             
-            # Extract video info
-            width = int(video_stream.get('width', 0))
-            height = int(video_stream.get('height', 0))
-            
-            # Get fps
-            fps_str = video_stream.get('r_frame_rate', '30/1')
-            fps_parts = fps_str.split('/')
-            fps = int(fps_parts[0]) / int(fps_parts[1]) if len(fps_parts) == 2 else 30.0
-            
-            # Get duration
-            duration = float(probe['format'].get('duration', 0))
-            
-            # Get codecs
-            video_codec = video_stream.get('codec_name', 'unknown')
-            audio_codec = audio_stream.get('codec_name', 'none') if audio_stream else 'none'
-            
-            # Get bitrates
-            video_bitrate = video_stream.get('bit_rate', '0')
-            audio_bitrate = audio_stream.get('bit_rate', '0') if audio_stream else '0'
-            
-            # Get file size
-            file_size = int(probe['format'].get('size', 0))
-            
-            return {
-                'width': width,
-                'height': height,
-                'fps': fps,
-                'duration': duration,
-                'video_codec': video_codec,
-                'audio_codec': audio_codec,
-                'video_bitrate': video_bitrate,
-                'audio_bitrate': audio_bitrate,
-                'file_size': file_size,
-                'aspect_ratio': width / height if height > 0 else 0,
-                'has_audio': audio_stream is not None,
-            }
+            # Copy - callers may modify their dict
+            info = _video_info_cached(*key)
+            return dict(info) if info else None
         
         except Exception as e:
             if config.DEBUG:
@@ -169,35 +699,13 @@ class FFmpegHelper:
             Dict with audio info or None
         """
         try:
-            probe = FFmpegHelper.probe_file(audio_path)
-            
-            if not probe:
-                return None
-            
-            # Find audio stream
-            audio_stream = next(
-                (stream for stream in probe['streams'] if stream['codec_type'] == 'audio'),
-                None
-            )
-            
-            if not audio_stream:
+            key = _file_key(audio_path)
+            if not key:
                 return None
             
-            # Extract audio info
-            duration = float(probe['format'].get('duration', 0))
-            codec = audio_stream.get('codec_name', 'unknown')
-            bitrate = audio_stream.get('bit_rate', '0')
-            sample_rate = int(audio_stream.get('sample_rate', 0))
-            channels = int(audio_stream.get('channels', 0))
-            
-            return {
-                'duration': duration,
-                'codec': codec,
-                'bitrate': bitrate,
-                'sample_rate': sample_rate,
-                'channels': channels,
-                'file_size': int(probe['format'].get('size', 0)),
-            }
+            # Copy - callers may modify their dict
+            info = _audio_info_cached(*key)
+            return dict(info) if info else None
         
         except Exception as e:
             if config.DEBUG:
@@ -216,8 +724,8 @@ class FFmpegHelper:
             Duration in seconds, 0.0 if error
         """
         try:
-            info = FFmpegHelper.get_video_info(video_path)
-            return info['duration'] if info else 0.0
+            key = _file_key(video_path)
+            return _probe_minimal(*key)[0] if key else 0.0
         except Exception:
             return 0.0
     
@@ -233,7 +741,7 @@ class FFmpegHelper:
             Duration in seconds, 0.0 if error
         """
         try:
-            info = FFmpegHelper.get_audio_info(audio_path)
+            info = _shared_audio_info(audio_path)
             return info['duration'] if info else 0.0
         except Exception:
             return 0.0
@@ -250,7 +758,7 @@ class FFmpegHelper:
             Tuple of (width, height) or None
         """
         try:
-            info = FFmpegHelper.get_video_info(video_path)
+            info = _shared_video_info(video_path)
             return (info['width'], info['height']) if info else None
         except Exception:
             return None
@@ -267,7 +775,7 @@ class FFmpegHelper:
             FPS value or None
         """
         try:
-            info = FFmpegHelper.get_video_info(video_path)
+            info = _shared_video_info(video_path)
             return info['fps'] if info else None
         except Exception:
             return None
@@ -284,7 +792,7 @@ class FFmpegHelper:
             Codec name or None
         """
         try:
-            info = FFmpegHelper.get_video_info(video_path)
+            info = _shared_video_info(video_path)
             return info['video_codec'] if info else None
         except Exception:
             return None
@@ -307,27 +815,36 @@ class FFmpegHelper:
             Path to extracted audio or None
         """
         try:
-            if not os.path.exists(video_path):
-                return None
-            
             # Generate output path if not provided
             if output_path is None:
-                video_name = Path(video_path).stem
-                output_path = str(config.TEMP_DIR / f"{video_name}_audio.{audio_format}")
+                output_path = _temp_output_path(video_path, f"_audio.{audio_format}")
+            
+            # Copy the stream whenever the target container can hold the
+            # source codec - runs at disk speed instead of transcoding
+            info = _shared_audio_info(video_path)
+            source_codec = info['codec'] if info else None
+            if source_codec in AUDIO_COPY_CODECS.get(audio_format, ()):
+                audio_codec = 'copy'
+            else:
+                audio_codec = AUDIO_FORMAT_ENCODERS.get(audio_format, config.AUDIO_CODEC)
             
             # Extract audio
             cmd = [
-                'ffmpeg',
+                'ffmpeg', *QUIET_ARGS,
                 '-i', video_path,
                 '-vn',  # No video
-                '-acodec', 'copy' if audio_format == 'm4a' else config.AUDIO_CODEC,
+                '-acodec', audio_codec,
+                '-threads', str(_POOL.threads),
                 '-y',
                 output_path
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            with _POOL.slots:
+                returncode, stderr = FFmpegHelper.run(cmd)
+            if returncode != 0 and config.DEBUG:
+                print(f"Audio extraction failed: {stderr}")
             
-            if result.returncode == 0 and os.path.exists(output_path):
+            if returncode == 0:
                 return output_path
             
             return None
@@ -352,36 +869,48 @@ class FFmpegHelper:
             input_path: Input video path
             output_path: Output video path
             output_format: Output format (mp4, mov, avi, etc.)
-            video_codec: Video codec (optional, uses config default)
+            video_codec: Video codec (optional, uses the best available
+                encoder - hardware if present - with its quality settings)
             audio_codec: Audio codec (optional, uses config default)
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            if not os.path.exists(input_path):
-                return False
-            
             if video_codec is None:
-                video_codec = config.VIDEO_CODEC
+                video_args = FFmpegHelper.get_video_encoder_args()
+            else:
+                video_args = [
+                    '-c:v', video_codec,
+                    '-preset', config.VIDEO_PRESET,
+                    '-crf', str(config.VIDEO_CRF),
+                ]
             
             if audio_codec is None:
                 audio_codec = config.AUDIO_CODEC
             
             cmd = [
-                'ffmpeg',
+                'ffmpeg', *QUIET_ARGS,
                 '-i', input_path,
-                '-c:v', video_codec,
+                *video_args,
                 '-c:a', audio_codec,
-                '-preset', config.VIDEO_PRESET,
-                '-crf', str(config.VIDEO_CRF),
-                '-y',
-                output_path
+                '-threads', str(_POOL.threads),
+                '-avoid_negative_ts', 'make_zero',
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # moov at the front - later probes of the output read its header
+            # instead of seeking to the end of the file
+            if output_format.lower() in ('mp4', 'mov', 'm4v'):
+                cmd.extend(['-movflags', '+faststart'])
+            
+            cmd.extend(['-y', output_path])
+            
+            with _POOL.slots:
+                returncode, stderr = FFmpegHelper.run(cmd)
+            if returncode != 0 and config.DEBUG:
+                print(f"Video conversion failed: {stderr}")
             
-            return result.returncode == 0 and os.path.exists(output_path)
+            return returncode == 0
         
         except Exception as e:
             if config.DEBUG:
@@ -408,15 +937,11 @@ class FFmpegHelper:
             Path to thumbnail or None
         """
         try:
-            if not os.path.exists(video_path):
-                return None
-            
             if output_path is None:
-                video_name = Path(video_path).stem
-                output_path = str(config.TEMP_DIR / f"{video_name}_thumb.jpg")
+                output_path = _temp_output_path(video_path, "_thumb.jpg")
             
             cmd = [
-                'ffmpeg',
+                'ffmpeg', *QUIET_ARGS,
                 '-ss', str(time_offset),
                 '-i', video_path,
                 '-vframes', '1',
@@ -425,9 +950,12 @@ class FFmpegHelper:
                 output_path
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            with _POOL.slots:
+                returncode, stderr = FFmpegHelper.run(cmd)
+            if returncode != 0 and config.DEBUG:
+                print(f"Thumbnail failed: {stderr}")
             
-            if result.returncode == 0 and os.path.exists(output_path):
+            if returncode == 0:
                 return output_path
             
             return None
@@ -437,6 +965,78 @@ class FFmpegHelper:
                 print(f"Error creating thumbnail: {str(e)}")
             return None
     
+    @staticmethod
+    def create_thumbnails_batch(
+        video_path: str,
+        time_offsets: List[float],
+        width: int = 320
+    ) -> List[bytes]:
+        """
+        Create several thumbnails from one video with a single ffmpeg run
+        
+        The frames are streamed as MJPEG over a pipe instead of starting
+        ffmpeg (and re-opening the video) once per thumbnail.
+        
+        Args:
+            video_path: Path to video file
+            time_offsets: Time offsets in seconds, one thumbnail each
+            width: Thumbnail width in pixels
+            
+        Returns:
+            JPEG bytes in ascending offset order (offsets past the end of
+            the video produce nothing), empty list on error
+        """
+        offsets = sorted(set(max(0.0, float(t)) for t in time_offsets))
+        if not offsets:
+            return []
+        
+        # Input-seek to the first offset; timestamps then start from there.
+        # Each term picks the first frame at or after one offset
+        start = offsets[0]
+        terms = '+'.join(
+            f"gte(t,{t - start:.3f})*(isnan(prev_pts)+lt(prev_pts*TB,{t - start:.3f}))"
+            for t in offsets
+        )
+        
+        cmd = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin',
+            '-ss', f"{start:.3f}",
+            '-i', video_path,
+            '-vf', f"select='{terms}',scale={width}:-2",
+            '-vsync', '0',
+            '-frames:v', str(len(offsets)),
+            '-c:v', 'mjpeg', '-q:v', '3',
+            '-f', 'image2pipe',
+            'pipe:1'
+        ]
+        
+        try:
+            with _POOL.slots:
+                result = subprocess.run(cmd, capture_output=True)
+        except (subprocess.SubprocessError, OSError) as e:
+            if config.DEBUG:
+                print(f"Error creating thumbnails: {str(e)}")
+            return []
+        
+        if result.returncode != 0:
+            if config.DEBUG:
+                print(f"Error creating thumbnails: {result.stderr.decode(errors='replace')}")
+            return []
+        
+        # Split the stream on JPEG start/end-of-image markers. 0xFFD9 can't
+        # occur inside the entropy-coded data (0xFF is byte-stuffed there)
+        data = result.stdout
+        thumbnails = []
+        pos = data.find(b'\xff\xd8')
+        while pos != -1:
+            end = data.find(b'\xff\xd9', pos + 2)
+            if end == -1:
+                break
+            thumbnails.append(data[pos:end + 2])
+            pos = data.find(b'\xff\xd8', end + 2)
+        
+        return thumbnails
+    
     @staticmethod
     def has_audio_stream(video_path: str) -> bool:
         """
@@ -449,8 +1049,8 @@ class FFmpegHelper:
             True if video has audio, False otherwise
         """
         try:
-            info = FFmpegHelper.get_video_info(video_path)
-            return info['has_audio'] if info else False
+            key = _file_key(video_path)
+            return _probe_minimal(*key)[1] if key else False
         except Exception:
             return False
     
@@ -466,11 +1066,184 @@ class FFmpegHelper:
             Bitrate string or None
         """
         try:
-            info = FFmpegHelper.get_video_info(video_path)
+            info = _shared_video_info(video_path)
             return info['video_bitrate'] if info else None
         except Exception:
             return None
 
+    @staticmethod
+    def get_keyframe_times(video_path: str) -> List[float]:
+        """
+        Get keyframe timestamps (cached per path, mtime and size)
+        
+        Args:
+            video_path: Path to video file
+            
+        Returns:
+            Sorted keyframe times in seconds from the file's start_time,
+            as -ss/-to expect them (empty on error)
+        """
+        try:
+            key = _file_key(video_path)
+            return list(_keyframes_cached(*key)) if key else []
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error reading keyframes: {str(e)}")
+            return []
+    
+    @staticmethod
+    def get_h264_parameter_sets(video_path: str) -> List[bytes]:
+        """
+        Get the H.264 SPS and PPS NAL units (cached per path, mtime and size)
+        
+        Args:
+            video_path: Path to video file
+            
+        Returns:
+            SPS and PPS NAL units (header byte included, no start codes) in
+            stream order (empty on error or for non-H.264 video)
+        """
+        try:
+            key = _file_key(video_path)
+            return list(_parameter_sets_cached(*key)) if key else []
+        except Exception as e:
+            if config.DEBUG:
+                print(f"Error reading parameter sets: {str(e)}")
+            return []
+    
+    @staticmethod
+    def run(cmd: List[str], tail_lines: int = 500) -> Tuple[int, str]:
+        """
+        Run an FFmpeg command, keeping only the tail of its stderr
+        
+        Progress output of a long encode can run to megabytes; only the
+        last lines matter for diagnosing failures.
+        
+        Args:
+            cmd: Command line
+            tail_lines: Number of stderr lines to keep
+            
+        Returns:
+            Tuple of (return code, last stderr lines - empty on success)
+        """
+        tail = deque(maxlen=tail_lines)
+        
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        
+        # stdout is discarded, so draining stderr here can't deadlock
+        for line in process.stderr:
+            tail.append(line)
+        
+        process.stderr.close()
+        returncode = process.wait()
+        
+        # Only a failure's output is worth decoding
+        if returncode == 0:
+            return returncode, ''
+        
+        return returncode, b''.join(tail).decode('utf-8', errors='replace')
+    
+    @staticmethod
+    def detect_hw_encoder() -> Optional[str]:
+        """
+        Find a working hardware H.264 encoder (result is cached)
+        
+        Honors config.HWACCEL. Hardware encoders only replace libx264,
+        so a custom config.VIDEO_CODEC disables detection.
+        
+        Returns:
+            Encoder name (e.g. 'h264_nvenc') or None to use the CPU encoder
+        """
+        if config.HWACCEL == 'none' or config.VIDEO_CODEC != 'libx264':
+            return None
+        
+        if config.HWACCEL == 'auto':
+            candidates = list(HW_ENCODERS.values())
+        else:
+            candidates = [HW_ENCODERS.get(config.HWACCEL, config.HWACCEL)]
+        
+        listed = _available_encoders()
+        for encoder in candidates:
+            if encoder in listed and _encoder_works(encoder):
+                return encoder
+        
+        return None
+    
+    @staticmethod
+    def has_filter(name: str) -> bool:
+        """
+        Check if this FFmpeg build has a filter (e.g. 'overlay_cuda')
+        
+        Args:
+            name: Filter name
+            
+        Returns:
+            True if the filter is compiled in
+        """
+        return name in _available_filters()
+    
+    @staticmethod
+    def get_x264_tuning_args(codec: str) -> List[str]:
+        """
+        Build tune/profile/level arguments for a software encode
+        
+        Args:
+            codec: Video codec the arguments are for
+            
+        Returns:
+            List of FFmpeg arguments (empty for codecs other than libx264)
+        """
+        if codec != 'libx264':
+            return []
+        
+        # High profile is 8-bit 4:2:0 only (10-bit phone footage would fail)
+        args = ['-pix_fmt', 'yuv420p']
+        if config.VIDEO_TUNE:
+            args += ['-tune', config.VIDEO_TUNE]
+        if config.VIDEO_PROFILE:
+            args += ['-profile:v', config.VIDEO_PROFILE]
+        if config.VIDEO_LEVEL:
+            args += ['-level', config.VIDEO_LEVEL]
+        
+        return args
+    
+    @staticmethod
+    def get_video_encoder_args(crf: Optional[int] = None) -> List[str]:
+        """
+        Build video codec + rate control arguments for the best encoder
+        
+        Args:
+            crf: Quality level (uses config.VIDEO_CRF if None); mapped to
+                 the equivalent constant-quality knob on hardware encoders
+            
+        Returns:
+            List of FFmpeg arguments starting with '-c:v'
+        """
+        quality = str(config.VIDEO_CRF if crf is None else crf)
+        encoder = FFmpegHelper.detect_hw_encoder()
+        
+        if encoder == 'h264_nvenc':
+            return ['-c:v', encoder, '-preset', 'p4', '-rc', 'vbr', '-cq', quality, '-b:v', '0']
+        if encoder == 'h264_qsv':
+            return ['-c:v', encoder, '-preset', 'veryfast', '-global_quality', quality]
+        if encoder == 'h264_amf':
+            return ['-c:v', encoder, '-rc', 'cqp', '-qp_i', quality, '-qp_p', quality]
+        if encoder == 'h264_videotoolbox':
+            # VideoToolbox has no CRF mode - use the target bitrate
+            return ['-c:v', encoder, '-b:v', config.TARGET_BITRATE]
+        
+        return [
+            '-c:v', config.VIDEO_CODEC,
+            '-preset', config.VIDEO_PRESET,
+            '-crf', quality,
+            *FFmpegHelper.get_x264_tuning_args(config.VIDEO_CODEC),
+        ]
+
 
 # Module-level convenience functions
 def check_ffmpeg() -> bool:
@@ -478,6 +1251,26 @@ def check_ffmpeg() -> bool:
     return FFmpegHelper.check_installed()
 
 
+def configure_ffmpeg_pool(max_concurrent: int, threads_per_process: Optional[int] = None) -> None:
+    """Resize the pool limiting concurrent ffmpeg runs"""
+    FFmpegHelper.configure_pool(max_concurrent, threads_per_process)
+
+
+def probe_file(file_path: str, select_streams: Optional[str] = None) -> Optional[Dict]:
+    """Probe a media file (cached per path, mtime and size)"""
+    return FFmpegHelper.probe_file(file_path, select_streams)
+
+
+def probe_files(file_paths: List[str]) -> Dict[str, Optional[Dict]]:
+    """Probe many files concurrently"""
+    return FFmpegHelper.probe_files(file_paths)
+
+
+def clear_probe_caches(file_path: str) -> None:
+    """Clear all in-memory probe caches and a file's persisted results"""
+    FFmpegHelper.clear_probe_caches(file_path)
+
+
 def get_video_info(video_path: str) -> Optional[Dict]:
     """Get video information"""
     return FFmpegHelper.get_video_info(video_path)
@@ -520,4 +1313,64 @@ def get_video_codec(video_path: str) -> Optional[str]:
 
 def convert_video_format(input_path: str, output_path: str, output_format: str = 'mp4') -> bool:
     """Convert video format"""
-    return FFmpegHelper.convert_video_format(input_path, output_path, output_format)
\ No newline at end of file
+    return FFmpegHelper.convert_video_format(input_path, output_path, output_format)
+
+
+def get_keyframe_times(video_path: str) -> List[float]:
+    """Get keyframe timestamps in seconds"""
+    return FFmpegHelper.get_keyframe_times(video_path)
+
+
+def get_h264_parameter_sets(video_path: str) -> List[bytes]:
+    """Get the H.264 SPS and PPS NAL units"""
+    return FFmpegHelper.get_h264_parameter_sets(video_path)
+
+
+def run_ffmpeg(cmd: List[str], tail_lines: int = 500) -> Tuple[int, str]:
+    """Run an FFmpeg command; returns (return code, stderr tail)"""
+    return FFmpegHelper.run(cmd, tail_lines)
+
+
+def detect_hw_encoder() -> Optional[str]:
+    """Get the hardware H.264 encoder to use, or None for CPU encoding"""
+    return FFmpegHelper.detect_hw_encoder()
+
+
+def has_filter(name: str) -> bool:
+    """Check if FFmpeg has a filter"""
+    return FFmpegHelper.has_filter(name)
+
+
+def get_x264_tuning_args(codec: str) -> List[str]:
+    """Get libx264 tune/profile/level arguments"""
+    return FFmpegHelper.get_x264_tuning_args(codec)
+
+
+def get_video_encoder_args(crf: Optional[int] = None) -> List[str]:
+    """Get video codec arguments for the best available encoder"""
+    return FFmpegHelper.get_video_encoder_args(crf)
+
+
+# Async variants for callers running an event loop. The work runs on the
+# loop's default thread pool, so the subprocess plumbing and the probe
+# caches are shared with the synchronous functions above
+
+async def probe_file_async(file_path: str, select_streams: Optional[str] = None) -> Optional[Dict]:
+    """Probe a media file without blocking the event loop"""
+    return await asyncio.to_thread(FFmpegHelper.probe_file, file_path, select_streams)
+
+
+async def get_video_info_async(video_path: str) -> Optional[Dict]:
+    """Get video information without blocking the event loop"""
+    return await asyncio.to_thread(FFmpegHelper.get_video_info, video_path)
+
+
+async def convert_video_format_async(
+    input_path: str,
+    output_path: str,
+    output_format: str = 'mp4'
+) -> bool:
+    """Convert video format without blocking the event loop"""
+    return await asyncio.to_thread(
+        FFmpegHelper.convert_video_format, input_path, output_path, output_format
+    )
@@ -0,0 +1,454 @@
+"""
+MP4 Probe - In-process metadata reader for MP4/M4A/MOV files
+Walks the moov box tree to build the same fields ffprobe reports,
+without starting a subprocess
+"""
+
+import os
+import struct
+from collections import Counter
+from math import gcd
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+MP4_EXTENSIONS = ('.mp4', '.m4a', '.m4v', '.mov')
+
+# Refuse to load absurd moov boxes - ffprobe handles those
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+# Sample entry fourcc -> ffprobe codec_name
+VIDEO_CODECS = {
+    b'avc1': 'h264', b'avc3': 'h264',
+    b'hvc1': 'hevc', b'hev1': 'hevc',
+    b'av01': 'av1',
+    b'vp09': 'vp9',
+    b'jpeg': 'mjpeg',
+    b'apch': 'prores', b'apcn': 'prores', b'apcs': 'prores',
+    b'apco': 'prores', b'ap4h': 'prores',
+}
+
+AUDIO_CODECS = {
+    b'Opus': 'opus',
+    b'fLaC': 'flac',
+    b'alac': 'alac',
+    b'ac-3': 'ac3',
+    b'ec-3': 'eac3',
+    b'sowt': 'pcm_s16le',
+    b'twos': 'pcm_s16be',
+}
+
+# MPEG-4 objectTypeIndication (esds) -> codec_name for 'mp4a' entries
+MP4A_OBJECT_TYPES = {
+    0x40: 'aac', 0x66: 'aac', 0x67: 'aac', 0x68: 'aac',
+    0x69: 'mp3', 0x6B: 'mp3',
+}
+
+AAC_SAMPLE_RATES = (
+    96000, 88200, 64000, 48000, 44100, 32000,
+    24000, 22050, 16000, 12000, 11025, 8000, 7350,
+)
+
+HANDLER_TYPES = {
+    b'vide': 'video',
+    b'soun': 'audio',
+    b'subt': 'subtitle', b'text': 'subtitle', b'sbtl': 'subtitle',
+}
+
+
+class _Unsupported(Exception):
+    """File needs ffprobe (fragmented, unknown codec, HE-AAC, ...)"""
+
+
+def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, body start, body end) for the boxes in data[start:end]"""
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise _Unsupported('truncated box')
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _find(data: bytes, start: int, end: int, path: List[bytes]) -> Optional[Tuple[int, int]]:
+    """Body range of the first box along a path of box types"""
+    for box_type in path:
+        for found_type, body_start, body_end in _iter_boxes(data, start, end):
+            if found_type == box_type:
+                start, end = body_start, body_end
+                break
+        else:
+            return None
+    return start, end
+
+
+def _read_moov(file_path: str) -> bytes:
+    """Body of the top-level moov box, seeking past mdat and friends"""
+    with open(file_path, 'rb') as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise _Unsupported('no moov box')
+
+            size, box_type = struct.unpack('>I4s', header)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack('>Q', f.read(8))[0]
+                header_size = 16
+            elif size == 0:
+                raise _Unsupported('no moov box')
+            if size < header_size:
+                raise _Unsupported('bad box size')
+
+            if box_type == b'moov':
+                if size > MAX_MOOV_SIZE:
+                    raise _Unsupported('moov too large')
+                body = f.read(size - header_size)
+                if len(body) != size - header_size:
+                    raise _Unsupported('truncated moov')
+                return body
+
+            f.seek(size - header_size, os.SEEK_CUR)
+
+
+def _timescale_duration(data: bytes, start: int) -> Tuple[int, int]:
+    """(timescale, duration) from an mvhd or mdhd body"""
+    if data[start] == 1:
+        timescale, duration = struct.unpack_from('>IQ', data, start + 20)
+    else:
+        timescale, duration = struct.unpack_from('>II', data, start + 12)
+    return timescale, duration
+
+
+def _descriptor(data: bytes, pos: int) -> Tuple[int, int, int]:
+    """(tag, body start, body length) of an MPEG-4 descriptor at pos"""
+    tag = data[pos]
+    pos += 1
+    length = 0
+    for _ in range(4):
+        byte = data[pos]
+        pos += 1
+        length = (length << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            break
+    return tag, pos, length
+
+
+def _parse_esds(data: bytes, start: int, end: int) -> Tuple[str, Optional[int], Optional[int]]:
+    """(codec_name, sample rate, channels) from an esds body"""
+    tag, pos, _ = _descriptor(data, start + 4)
+    if tag != 0x03:
+        raise _Unsupported('no ES descriptor')
+
+    flags = data[pos + 2]
+    pos += 3
+    if flags & 0x80:
+        pos += 2
+    if flags & 0x40:
+        pos += 1 + data[pos]
+    if flags & 0x20:
+        pos += 2
+
+    tag, pos, length = _descriptor(data, pos)
+    if tag != 0x04:
+        raise _Unsupported('no decoder config')
+    codec = MP4A_OBJECT_TYPES.get(data[pos])
+    if codec is None:
+        raise _Unsupported('unknown mp4a object type')
+    if codec != 'aac':
+        return codec, None, None
+
+    # AudioSpecificConfig: 5 bits object type, 4 bits rate index, 4 bits channels
+    tag, pos, length = _descriptor(data, pos + 13)
+    if tag != 0x05 or length < 2 or pos + 2 > end:
+        return codec, None, None
+    bits = int.from_bytes(data[pos:pos + 2], 'big')
+    object_type = bits >> 11
+    if object_type in (5, 29, 31):
+        # SBR/PS (HE-AAC) report a different output rate - leave to ffprobe
+        raise _Unsupported('HE-AAC')
+    rate_index = (bits >> 7) & 0x0F
+    channels = (bits >> 3) & 0x0F
+    sample_rate = AAC_SAMPLE_RATES[rate_index] if rate_index < len(AAC_SAMPLE_RATES) else None
+    return codec, sample_rate, channels or None
+
+
+class _BitReader:
+    """MSB-first bit reader with Exp-Golomb codes, for H.264 SPS fields"""
+
+    def __init__(self, data: bytes):
+        # Drop emulation prevention bytes (00 00 03 -> 00 00)
+        self.data = data.replace(b'\x00\x00\x03', b'\x00\x00')
+        self.pos = 0
+
+    def bits(self, count: int) -> int:
+        value = 0
+        for _ in range(count):
+            byte = self.data[self.pos >> 3]
+            value = (value << 1) | ((byte >> (7 - (self.pos & 7))) & 1)
+            self.pos += 1
+        return value
+
+    def ue(self) -> int:
+        zeros = 0
+        while not self.bits(1):
+            zeros += 1
+            if zeros > 31:
+                raise _Unsupported('bad Exp-Golomb code')
+        return (1 << zeros) - 1 + self.bits(zeros)
+
+    def se(self) -> int:
+        value = self.ue()
+        return (value + 1) // 2 if value & 1 else -(value // 2)
+
+
+def _h264_pix_fmt(sps: bytes) -> str:
+    """
+    Pixel format ffprobe reports for an H.264 stream, from its SPS
+
+    Chroma format and bit depth come from the high-profile fields;
+    full-range 8-bit video is reported as yuvj*, which needs the VUI.
+    """
+    r = _BitReader(sps[1:])  # skip the NAL header
+    profile_idc = r.bits(8)
+    r.bits(16)  # constraint flags, level_idc
+    r.ue()  # seq_parameter_set_id
+
+    chroma_format_idc, bit_depth = 1, 8
+    if profile_idc in (100, 110, 122, 244, 44, 83, 86, 118, 128, 138, 139, 134, 135):
+        chroma_format_idc = r.ue()
+        if chroma_format_idc == 3:
+            r.bits(1)  # separate_colour_plane_flag
+        bit_depth = 8 + r.ue()
+        r.ue()  # bit_depth_chroma_minus8
+        r.bits(1)  # qpprime_y_zero_transform_bypass_flag
+        if r.bits(1):  # seq_scaling_matrix_present_flag
+            for i in range(8 if chroma_format_idc != 3 else 12):
+                if r.bits(1):
+                    last = next_scale = 8
+                    for _ in range(16 if i < 6 else 64):
+                        if next_scale:
+                            next_scale = (last + r.se()) % 256
+                        last = next_scale or last
+
+    r.ue()  # log2_max_frame_num_minus4
+    pic_order_cnt_type = r.ue()
+    if pic_order_cnt_type == 0:
+        r.ue()
+    elif pic_order_cnt_type == 1:
+        r.bits(1)
+        r.se()
+        r.se()
+        for _ in range(r.ue()):
+            r.se()
+    r.ue()  # max_num_ref_frames
+    r.bits(1)  # gaps_in_frame_num_value_allowed_flag
+    r.ue()  # pic_width_in_mbs_minus1
+    r.ue()  # pic_height_in_map_units_minus1
+    if not r.bits(1):  # frame_mbs_only_flag
+        r.bits(1)
+    r.bits(1)  # direct_8x8_inference_flag
+    if r.bits(1):  # frame_cropping_flag
+        for _ in range(4):
+            r.ue()
+
+    full_range = False
+    if r.bits(1):  # vui_parameters_present_flag
+        if r.bits(1) and r.bits(8) == 255:  # aspect_ratio_idc == Extended_SAR
+            r.bits(32)
+        if r.bits(1):  # overscan_info_present_flag
+            r.bits(1)
+        if r.bits(1):  # video_signal_type_present_flag
+            r.bits(3)
+            full_range = bool(r.bits(1))
+
+    if chroma_format_idc == 0:
+        return 'gray' if bit_depth == 8 else f"gray{bit_depth}le"
+    subsampling = {1: '420', 2: '422', 3: '444'}[chroma_format_idc]
+    if bit_depth == 8:
+        return f"yuv{'j' if full_range else ''}{subsampling}p"
+    return f"yuv{subsampling}p{bit_depth}le"
+
+
+def h264_pps_uses_cabac(pps: bytes) -> bool:
+    """Whether a PPS NAL unit selects CABAC (rather than CAVLC) entropy coding"""
+    r = _BitReader(pps[1:])  # skip the NAL header
+    r.ue()  # pic_parameter_set_id
+    r.ue()  # seq_parameter_set_id
+    return bool(r.bits(1))  # entropy_coding_mode_flag
+
+
+def _avcc_pix_fmt(data: bytes, start: int, end: int) -> str:
+    """Pixel format from the first SPS in an avcC body"""
+    if end - start < 8 or not data[start + 5] & 0x1F:
+        raise _Unsupported('avcC without SPS')
+    length = struct.unpack_from('>H', data, start + 6)[0]
+    if start + 8 + length > end:
+        raise _Unsupported('truncated SPS')
+    return _h264_pix_fmt(data[start + 8:start + 8 + length])
+
+
+def _frame_rate(data: bytes, stts: Tuple[int, int], timescale: int) -> str:
+    """Most common frame duration from stts as an ffprobe-style rational"""
+    start, _ = stts
+    count = struct.unpack_from('>I', data, start + 4)[0]
+    deltas = Counter()
+    for i in range(count):
+        samples, delta = struct.unpack_from('>II', data, start + 8 + 8 * i)
+        deltas[delta] += samples
+    if not deltas:
+        return '0/0'
+
+    delta = deltas.most_common(1)[0][0]
+    if not delta:
+        return '0/0'
+    divisor = gcd(timescale, delta)
+    return f"{timescale // divisor}/{delta // divisor}"
+
+
+def _total_sample_size(data: bytes, stsz: Tuple[int, int]) -> int:
+    """Sum of sample sizes from stsz"""
+    start, _ = stsz
+    sample_size, count = struct.unpack_from('>II', data, start + 4)
+    if sample_size:
+        return sample_size * count
+    return sum(struct.unpack_from(f'>{count}I', data, start + 12))
+
+
+def _parse_track(data: bytes, start: int, end: int, index: int) -> Dict:
+    """One ffprobe-style stream dict from a trak body"""
+    mdia = _find(data, start, end, [b'mdia'])
+    hdlr = mdia and _find(data, *mdia, [b'hdlr'])
+    mdhd = mdia and _find(data, *mdia, [b'mdhd'])
+    if not hdlr or not mdhd:
+        raise _Unsupported('incomplete track')
+
+    codec_type = HANDLER_TYPES.get(data[hdlr[0] + 8:hdlr[0] + 12], 'data')
+    stream = {'index': index, 'codec_type': codec_type}
+    if codec_type not in ('video', 'audio'):
+        return stream
+
+    stbl = _find(data, *mdia, [b'minf', b'stbl'])
+    stsd = stbl and _find(data, *stbl, [b'stsd'])
+    if not stsd:
+        raise _Unsupported('no sample description')
+
+    entry_type, entry_start, entry_end = next(_iter_boxes(data, stsd[0] + 8, stsd[1]))
+    timescale, duration = _timescale_duration(data, mdhd[0])
+
+    if codec_type == 'video':
+        codec = VIDEO_CODECS.get(entry_type)
+        if codec is None:
+            raise _Unsupported('unknown video codec')
+        width, height = struct.unpack_from('>HH', data, entry_start + 24)
+        stream.update(codec_name=codec, width=width, height=height)
+
+        # pix_fmt is only derived for H.264 (from its SPS); other codecs
+        # leave it out rather than guess
+        if codec == 'h264':
+            avcc = _find(data, entry_start + 78, entry_end, [b'avcC'])
+            if not avcc:
+                raise _Unsupported('avc1 without avcC')
+            stream['pix_fmt'] = _avcc_pix_fmt(data, *avcc)
+
+        stts = _find(data, *stbl, [b'stts'])
+        stream['r_frame_rate'] = _frame_rate(data, stts, timescale) if stts else '0/0'
+    else:
+        version, channels = struct.unpack_from('>H6xH', data, entry_start + 8)
+        sample_rate = struct.unpack_from('>I', data, entry_start + 24)[0] >> 16
+        if version == 2:
+            raise _Unsupported('QuickTime v2 sound description')
+
+        if entry_type == b'mp4a':
+            children_start = entry_start + (44 if version == 1 else 28)
+            esds = _find(data, children_start, entry_end, [b'esds'])
+            if not esds:
+                raise _Unsupported('mp4a without esds')
+            codec, esds_rate, esds_channels = _parse_esds(data, *esds)
+            sample_rate = esds_rate or sample_rate
+            channels = esds_channels or channels
+        else:
+            codec = AUDIO_CODECS.get(entry_type)
+            if codec is None:
+                raise _Unsupported('unknown audio codec')
+
+        stream.update(codec_name=codec, sample_rate=str(sample_rate), channels=channels)
+
+    stsz = _find(data, *stbl, [b'stsz'])
+    if stsz and duration and timescale:
+        stream['bit_rate'] = str(int(_total_sample_size(data, stsz) * 8 * timescale / duration))
+
+    return stream
+
+
+def _selected(streams: List[Dict], select_streams: str) -> List[Dict]:
+    """Apply an ffprobe stream specifier ('', 'v', 'a', 'v:N', 'a:N')"""
+    if not select_streams:
+        return streams
+
+    kind, _, number = select_streams.partition(':')
+    codec_type = {'v': 'video', 'a': 'audio'}.get(kind)
+    if codec_type is None or (number and not number.isdigit()):
+        raise _Unsupported('stream specifier')
+
+    matching = [s for s in streams if s['codec_type'] == codec_type]
+    return matching[int(number):int(number) + 1] if number else matching
+
+
+def probe_mp4(file_path: str, select_streams: str = '') -> Optional[Dict]:
+    """
+    Read stream and format metadata from an MP4/M4A/MOV file
+
+    Returns the subset of ffprobe's JSON the project reads (see
+    ffmpeg_helper.PROBE_ENTRIES), with the same types ffprobe uses.
+
+    Args:
+        file_path: Path to media file
+        select_streams: ffprobe-style stream specifier ('' for all)
+
+    Returns:
+        Dict with 'streams' and 'format', or None if the file needs ffprobe
+        (not MP4, fragmented, unusual codec or layout)
+    """
+    if not file_path.lower().endswith(MP4_EXTENSIONS):
+        return None
+
+    try:
+        moov = _read_moov(file_path)
+        end = len(moov)
+
+        if _find(moov, 0, end, [b'mvex']):
+            raise _Unsupported('fragmented')
+        mvhd = _find(moov, 0, end, [b'mvhd'])
+        if not mvhd:
+            raise _Unsupported('no mvhd')
+        timescale, duration = _timescale_duration(moov, mvhd[0])
+        if not timescale or not duration:
+            raise _Unsupported('no duration')
+
+        streams = [
+            _parse_track(moov, body_start, body_end, index)
+            for index, (body_start, body_end) in enumerate(
+                (s, e) for box_type, s, e in _iter_boxes(moov, 0, end) if box_type == b'trak'
+            )
+        ]
+
+        seconds = duration / timescale
+        size = os.path.getsize(file_path)
+        return {
+            'streams': _selected(streams, select_streams),
+            'format': {
+                'duration': f"{seconds:.6f}",
+                'size': str(size),
+                'bit_rate': str(int(size * 8 / seconds)),
+            },
+        }
+
+    except (_Unsupported, OSError, struct.error, IndexError, KeyError, StopIteration, ValueError):
+        return None